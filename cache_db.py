@@ -0,0 +1,75 @@
+"""
+Persistent cache storage
+
+The solution, classification and chat caches each keep a table in an SQLite
+file (usually the same RESPONSE_CACHE_DB). Every file is opened once per
+process and the connection is shared by all caches that use it.
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheDB:
+    """A cache file's single connection, usable from any thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit + WAL: single-row writes, readers never block on them
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def execute(self, sql: str, params: Any = ()) -> List[tuple]:
+        """Run one statement and return all of its rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_databases: Dict[str, CacheDB] = {}
+_databases_lock = threading.Lock()
+
+
+def open_cache_db(path: str, ddl: str, label: str) -> Optional[CacheDB]:
+    """
+    Get the shared cache database at path with a cache's table created.
+
+    Args:
+        path: SQLite file; empty disables the cache
+        ddl: CREATE TABLE IF NOT EXISTS statement for the cache's table
+        label: Cache name used in the warning when the file can't be used
+
+    Returns:
+        The CacheDB, or None if disabled or unavailable
+    """
+    if not path:
+        return None
+    try:
+        with _databases_lock:
+            key = os.path.abspath(path)
+            db = _databases.get(key)
+            if db is None:
+                db = _databases[key] = CacheDB(path)
+        db.execute(ddl)
+        return db
+    except sqlite3.Error as e:
+        logger.warning("Persistent %s unavailable: %s", label, e)
+        return None
+
+
+@atexit.register
+def _close_cache_dbs():
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
@@ -1,7 +1,5 @@
 import ast
-import subprocess
-import tempfile
-import os
+import traceback
 from typing import Dict, Any, List
 from llm_client import LLMClient
 from config import get_llm_config
@@ -108,29 +106,11 @@ class CodeValidator:
     def _dry_run_test(self, code: str) -> Dict[str, Any]:
         """Perform a dry run test - compile but don't fully execute."""
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            # Try to compile the code
-            result = subprocess.run(
-                ['python', '-m', 'py_compile', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # Clean up
-            os.unlink(temp_file)
-            if os.path.exists(temp_file + 'c'):  # Remove .pyc file
-                os.unlink(temp_file + 'c')
-            
-            if result.returncode == 0:
-                return {'success': True, 'error': None}
-            else:
-                return {'success': False, 'error': result.stderr}
-                
+            # Compile in-process: same check as py_compile, without a temp file or interpreter
+            compile(code, '<generated>', 'exec')
+            return {'success': True, 'error': None}
+        except SyntaxError as e:
+            return {'success': False, 'error': ''.join(traceback.format_exception_only(type(e), e))}
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
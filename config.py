@@ -26,6 +26,63 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "not-needed")
 # Ollama Configuration (used when LLM_PROVIDER = "ollama")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 
+# How long Ollama keeps the model loaded after a request (e.g. "10m", "1h").
+# Set it to roughly the length of a session so calls don't pay for reloading the model.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+
+# Seconds to wait for a single LLM response before the request fails
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+# Maximum number of LLM requests issued at once (per RobustSolutionCreator). Match
+# it to the server's parallelism; for Ollama, start the server with
+# OLLAMA_NUM_PARALLEL set to the same value.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Number of tasks the worker in main.py runs side by side (1 = one at a time).
+# Only tasks whose dependencies are already done are queued, so any that are
+# pending together can run concurrently.
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+
+# Upper bound on generated tokens per solution request (0 = no limit). Reasoning
+# models count their chain of thought against this, so leave room for it.
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "0"))
+
+# Sampling for solution generation. Deterministic by default so repeated prompts
+# give the same answer and the response caches below stay valid.
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0"))
+LLM_TOP_P = float(os.getenv("LLM_TOP_P", "1.0"))
+LLM_SEED = int(os.getenv("LLM_SEED", "42"))
+
+# Response cache for RobustSolutionCreator. Identical prompts are always served
+# from memory for RESPONSE_CACHE_TTL seconds; at most RESPONSE_CACHE_SIZE solutions
+# are kept, least recently used dropped first. Optionally, a task whose
+# title/description/deliverable embedding is at least SEMANTIC_CACHE_THRESHOLD
+# cosine-similar to an earlier task with the same project context reuses that
+# solution too. Off by default (any value above 1 disables it); each cache miss
+# then costs an extra embedding request.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # seconds
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "1.1"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))  # seconds
+
+# Set RESPONSE_CACHE_DB to a file path to also keep exact-match solutions on disk
+# across restarts. Only solutions that executed successfully are written there.
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB", "")
+RESPONSE_CACHE_MAX_AGE_DAYS = int(os.getenv("RESPONSE_CACHE_MAX_AGE_DAYS", "7"))
+
+# Serve trivial, well-known code tasks (FizzBuzz, Hello World, factorial, Fibonacci)
+# from built-in Python templates instead of asking the LLM. Only used when the
+# description adds nothing beyond the title.
+TEMPLATE_SOLUTIONS = os.getenv("TEMPLATE_SOLUTIONS", "false").lower() == "true"
+
+# Exact-match cache inside LLMClient.chat() for repeated identical requests (0 = off).
+# Keyed on model, messages and sampling arguments; set LLM_RESPONSE_CACHE_DB to keep
+# the cached responses across runs.
+LLM_RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "0"))
+LLM_RESPONSE_CACHE_TTL = int(os.getenv("LLM_RESPONSE_CACHE_TTL", "3600"))  # seconds
+LLM_RESPONSE_CACHE_DB = os.getenv("LLM_RESPONSE_CACHE_DB", "")
+
 # Reasoning Model Configuration
 # Some models (like GPT-OSS:120b) output their full chain of thought and mark the
 # final answer with a special marker. Enable extraction to get only the final answer.
@@ -48,15 +105,40 @@ def get_llm_config():
         "model": LLM_MODEL,
         "extract_final_answer": EXTRACT_FINAL_ANSWER,
         "final_answer_marker": FINAL_ANSWER_MARKER,
+        "timeout": LLM_REQUEST_TIMEOUT,
+        "response_cache_size": LLM_RESPONSE_CACHE_SIZE,
+        "response_cache_ttl": LLM_RESPONSE_CACHE_TTL,
+        "response_cache_db": LLM_RESPONSE_CACHE_DB,
     }
 
     if LLM_PROVIDER == "openai":
         config["base_url"] = OPENAI_BASE_URL
         config["api_key"] = OPENAI_API_KEY
+    else:
+        config["base_url"] = OLLAMA_HOST
+        config["keep_alive"] = OLLAMA_KEEP_ALIVE
 
     return config
 
 
+def get_generation_options():
+    """
+    Get sampling parameters for solution generation requests.
+
+    Returns:
+        Dict of keyword arguments for LLMClient.chat()
+    """
+    options = {
+        "temperature": LLM_TEMPERATURE,
+        "top_p": LLM_TOP_P,
+        "seed": LLM_SEED,
+    }
+    if LLM_MAX_TOKENS > 0:
+        options["max_tokens"] = LLM_MAX_TOKENS
+
+    return options
+
+
 def print_config():
     """Print current configuration for debugging."""
     print("=" * 60)
@@ -64,12 +146,29 @@ def print_config():
     print("=" * 60)
     print(f"Provider: {LLM_PROVIDER}")
     print(f"Model: {LLM_MODEL}")
+    print(f"Request Timeout: {LLM_REQUEST_TIMEOUT}s")
+    print(f"Worker Concurrency: {WORKER_CONCURRENCY}")
 
     if LLM_PROVIDER == "openai":
         print(f"Base URL: {OPENAI_BASE_URL}")
         print(f"API Key: {'*' * 8 if OPENAI_API_KEY != 'not-needed' else 'not-needed'}")
     else:
         print(f"Ollama Host: {OLLAMA_HOST}")
+        print(f"Ollama Keep Alive: {OLLAMA_KEEP_ALIVE}")
+
+    print(f"\nGeneration Settings:")
+    print(f"Temperature: {LLM_TEMPERATURE}, Top P: {LLM_TOP_P}, Seed: {LLM_SEED}")
+    print(f"Max Tokens: {LLM_MAX_TOKENS or 'unlimited'}")
+    print(f"Template Solutions: {TEMPLATE_SOLUTIONS}")
+
+    print(f"\nResponse Cache Settings:")
+    print(f"Memory Cache: {RESPONSE_CACHE_SIZE} entries, {RESPONSE_CACHE_TTL}s")
+    print(f"Embedding Model: {EMBEDDING_MODEL}")
+    print(f"Semantic Threshold: {SEMANTIC_CACHE_THRESHOLD if SEMANTIC_CACHE_THRESHOLD <= 1 else 'disabled'}")
+    print(f"Semantic TTL: {SEMANTIC_CACHE_TTL}s")
+    print(f"Persistent Cache: {RESPONSE_CACHE_DB or 'disabled'} ({RESPONSE_CACHE_MAX_AGE_DAYS} days)")
+    print(f"Chat Cache: {LLM_RESPONSE_CACHE_SIZE or 'disabled'} entries, {LLM_RESPONSE_CACHE_TTL}s"
+          f"{', stored in ' + LLM_RESPONSE_CACHE_DB if LLM_RESPONSE_CACHE_DB else ''}")
 
     print(f"\nReasoning Model Settings:")
     print(f"Extract Final Answer: {EXTRACT_FINAL_ANSWER}")
@@ -1,14 +1,15 @@
+import heapq
 import json
 import os
 from typing import Dict, Any, List, Optional
-from task_queue import TaskQueue, TaskStatus
+from task_queue import TaskStatus, shared_task_queue
 
 class ContextManager:
     """Manages project context and artifact history for better task coordination."""
     
     def __init__(self, artifacts_dir: str = "artifacts"):
         self.artifacts_dir = artifacts_dir
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
     
     def get_project_context(self, project_id: str) -> Dict[str, Any]:
         """Get comprehensive context for a project including all completed work."""
@@ -20,7 +21,7 @@ class ContextManager:
         for task in completed_tasks:
             if task['result']:
                 try:
-                    result_data = json.loads(task['result'])
+                    result_data = self.task_queue.load_result(task['result'])
                     if result_data.get('code'):
                         project_tasks.append({
                             'title': task['title'],
@@ -77,9 +78,8 @@ class ContextManager:
                 except Exception:
                     continue
         
-        # Sort by modification time, most recent first
-        artifacts.sort(key=lambda x: x['modified_time'], reverse=True)
-        return artifacts[:limit]
+        # Most recent first; only the top `limit` need ordering
+        return heapq.nlargest(limit, artifacts, key=lambda x: x['modified_time'])
     
     def _get_latest_code(self, completed_tasks: List[Dict[str, Any]]) -> Optional[str]:
         """Get the most recent complete code artifact."""
@@ -91,10 +91,16 @@ class ContextManager:
         latest_task = completed_tasks[-1]
         return latest_task.get('code')
     
-    def generate_context_prompt(self, current_task: Dict[str, Any], project_id: str) -> str:
-        """Generate a context-aware prompt for the current task."""
+    def generate_context_prompt(self, current_task: Dict[str, Any], project_id: str,
+                                context: Optional[Dict[str, Any]] = None) -> str:
+        """Generate a context-aware prompt for the current task.
         
-        context = self.get_project_context(project_id)
+        Callers that already hold get_project_context(project_id) can pass it
+        as context to skip rebuilding it.
+        """
+        
+        if context is None:
+            context = self.get_project_context(project_id)
         
         context_prompt = f"""You are working on a software development project. Here's the context of previous work:
 
@@ -139,10 +145,12 @@ Provide complete, working Python code that builds upon what's already been creat
         
         return context_prompt
     
-    def should_build_upon_existing(self, current_task: Dict[str, Any], project_id: str) -> bool:
+    def should_build_upon_existing(self, current_task: Dict[str, Any], project_id: str,
+                                   context: Optional[Dict[str, Any]] = None) -> bool:
         """Determine if the current task should build upon existing code."""
         
-        context = self.get_project_context(project_id)
+        if context is None:
+            context = self.get_project_context(project_id)
         
         # If there's existing code and this isn't the first task, build upon it
         if context['latest_code'] and context['task_count'] > 0:
@@ -154,10 +162,12 @@ Provide complete, working Python code that builds upon what's already been creat
         
         return False
     
-    def get_code_integration_guidance(self, current_task: Dict[str, Any], project_id: str) -> str:
+    def get_code_integration_guidance(self, current_task: Dict[str, Any], project_id: str,
+                                      context: Optional[Dict[str, Any]] = None) -> str:
         """Provide specific guidance for integrating with existing code."""
         
-        context = self.get_project_context(project_id)
+        if context is None:
+            context = self.get_project_context(project_id)
         
         if not context['latest_code']:
             return "Create new standalone implementation."
@@ -25,8 +25,8 @@ def test_simple_task():
     print(f"✅ Project created: {project_id}")
     
     # Check if tasks were generated
-    from task_queue import TaskQueue
-    task_queue = TaskQueue()
+    from task_queue import shared_task_queue
+    task_queue = shared_task_queue()
     task_counts = task_queue.get_task_count_by_status()
     print(f"📋 Task counts: {task_counts}")
     
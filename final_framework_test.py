@@ -27,8 +27,8 @@ def test_focused_task_generation():
         project_id = manager.create_project(f"Test_{expected_domain}", objective)
         
         # Check what tasks were generated
-        from task_queue import TaskQueue
-        task_queue = TaskQueue()
+        from task_queue import shared_task_queue
+        task_queue = shared_task_queue()
         
         # Get the most recent pending task (should be for this project)
         task = task_queue.get_next_task()
@@ -51,10 +51,10 @@ def test_safe_execution():
     print("="*60)
     
     from worker_agent import WorkerAgent
-    from task_queue import TaskQueue
+    from task_queue import shared_task_queue
     
     worker = WorkerAgent()
-    task_queue = TaskQueue()
+    task_queue = shared_task_queue()
     
     # Create a safe test task
     safe_task_id = task_queue.add_task(
@@ -24,8 +24,8 @@ def test_full_pipeline():
     print(f"🎯 Objective: {objective}")
     
     # Check task generation
-    from task_queue import TaskQueue
-    task_queue = TaskQueue()
+    from task_queue import shared_task_queue
+    task_queue = shared_task_queue()
     task_counts = task_queue.get_task_count_by_status()
     print(f"📋 Initial task counts: {task_counts}")
     
@@ -137,11 +137,11 @@ def test_classification_integration():
     
     from task_classifier import TaskClassifier
     from worker_agent import WorkerAgent
-    from task_queue import TaskQueue
+    from task_queue import shared_task_queue
     
     classifier = TaskClassifier()
     worker = WorkerAgent()
-    task_queue = TaskQueue()
+    task_queue = shared_task_queue()
     
     # Create a test task manually
     test_task = {
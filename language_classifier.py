@@ -1,23 +1,62 @@
 from llm_client import LLMClient
 from config import get_llm_config
 import json
+import logging
 from typing import Dict, Any, Optional
 
+# Classification runs in RobustSolutionCreator's worker threads, so report through
+# logging (lazy %-formatting, no stdout lock) rather than print
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Keyword tables for the heuristics, written in lowercase and matched as substrings of
+# the lowercased task text.
+# Built once at import; a union regex was measured slower than these 'in' checks.
+
+# Explicit language mentions, checked in this (priority) order
+_EXPLICIT_LANGUAGE_PATTERNS = {
+    'javascript': ('javascript', 'js ', ' js', 'node.js', 'html5', 'canvas', 'browser game', 'web game'),
+    'java': ('java ', ' java', 'android', 'spring boot'),
+    'python': ('python', 'django', 'flask', 'pandas', 'numpy'),
+    'cpp': ('c++', 'cpp', 'unreal', 'opengl'),
+    'csharp': ('c#', 'csharp', 'c sharp', '.net', 'unity'),
+    'go': ('golang', ' go ', 'gin framework'),
+    'rust': ('rust ', 'cargo', 'wasm')
+}
+
+_PROGRAMMING_INDICATORS = (
+    'code', 'program', 'script', 'app', 'application', 'software',
+    'build', 'create', 'develop', 'implement', 'api', 'system',
+    'web', 'game', 'calculator', 'tool', 'engine', 'framework'
+)
+
+_NON_PROGRAMMING_INDICATORS = (
+    'write story', 'write poem', 'creative writing', 'essay',
+    'research report', 'documentation only', 'analysis report'
+)
+
+_FALLBACK_JAVASCRIPT_KEYWORDS = ('javascript', 'js', 'web', 'browser', 'html', 'canvas', 'html5')
+_FALLBACK_JAVA_KEYWORDS = ('java ', 'android', 'spring')
+
 class LanguageClassifier:
     """LLM-powered language classifier for programming tasks."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm_client: Optional[LLMClient] = None):
         # Get LLM configuration
         llm_config = get_llm_config()
         self.model_name = model_name or llm_config["model"]
 
         # Initialize LLM client
-        self.llm_client = LLMClient(
-            provider=llm_config["provider"],
-            model=self.model_name,
-            api_key=llm_config.get("api_key"),
-            base_url=llm_config.get("base_url")
-        )
+        if llm_client is not None:
+            self.llm_client = llm_client.with_options(model=self.model_name)
+        else:
+            self.llm_client = LLMClient(
+                provider=llm_config["provider"],
+                model=self.model_name,
+                api_key=llm_config.get("api_key"),
+                base_url=llm_config.get("base_url")
+            )
         self.supported_languages = {
             'javascript': {
                 'name': 'JavaScript/Node.js',
@@ -78,8 +117,11 @@ class LanguageClassifier:
         description = task.get('description', '')
         deliverable = task.get('subtask_data', {}).get('deliverable', '')
         
+        # All keyword checks below scan the same lowercased text; build it once
+        combined_text = self._combined_text(title, description, deliverable)
+        
         # Check if this is even a programming task
-        if not self._is_programming_task(title, description, deliverable):
+        if not self._is_programming_text(combined_text):
             return {
                 'language': 'none',
                 'confidence': 1.0,
@@ -88,7 +130,7 @@ class LanguageClassifier:
             }
         
         # PRIORITY FIX: Check for explicit language mentions first
-        explicit_language = self._check_explicit_language_mentions(title, description, deliverable)
+        explicit_language = self._match_explicit_language(combined_text)
         if explicit_language:
             return explicit_language
         
@@ -107,27 +149,22 @@ class LanguageClassifier:
             return self._validate_language_result(result, title, description, deliverable)
             
         except Exception as e:
-            print(f"[LANGUAGE] LLM classification failed: {e}")
+            logger.warning("LLM classification failed: %s", e)
             # Fallback to simple heuristic
-            return self._fallback_language_classification(title, description, deliverable)
+            return self._fallback_language_text(combined_text)
     
-    def _check_explicit_language_mentions(self, title: str, description: str, deliverable: str) -> Optional[Dict[str, Any]]:
-        """Check for explicit language mentions with high priority."""
-        
-        combined_text = f"{title} {description} {deliverable}".lower()
-        
-        # Explicit language mentions (case-insensitive)
-        explicit_patterns = {
-            'javascript': ['javascript', 'js ', ' js', 'node.js', 'html5', 'canvas', 'browser game', 'web game'],
-            'java': ['java ', ' java', 'android', 'spring boot'],
-            'python': ['python', 'django', 'flask', 'pandas', 'numpy'],
-            'cpp': ['c++', 'cpp', 'unreal', 'opengl'],
-            'csharp': ['c#', 'csharp', 'c sharp', '.net', 'unity'],
-            'go': ['golang', ' go ', 'gin framework'],
-            'rust': ['rust ', 'cargo', 'wasm']
-        }
+    def _combined_text(self, title: str, description: str, deliverable: str) -> str:
+        """Lowercased text that the keyword heuristics search."""
+        return f"{title} {description} {deliverable}".lower()
+    
+    def check_explicit_language_mentions(self, title: str, description: str, deliverable: str) -> Optional[Dict[str, Any]]:
+        """Language explicitly named in the task (e.g. "in Rust"), or None."""
+        return self._match_explicit_language(self._combined_text(title, description, deliverable))
+    
+    def _match_explicit_language(self, combined_text: str) -> Optional[Dict[str, Any]]:
+        """Explicit language mention check on already-combined lowercase text."""
         
-        for language, patterns in explicit_patterns.items():
+        for language, patterns in _EXPLICIT_LANGUAGE_PATTERNS.items():
             for pattern in patterns:
                 if pattern in combined_text:
                     return {
@@ -202,20 +239,21 @@ IMPORTANT:
         """Parse LLM response for language classification."""
         
         try:
-            # Find JSON in the response
+            # Decode the first complete JSON object in place; raw_decode stops at its
+            # closing brace, so trailing text (even with braces) doesn't matter
             start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
+            while start_idx != -1:
+                try:
+                    result, _ = _JSON_DECODER.raw_decode(content, start_idx)
+                    return result
+                except json.JSONDecodeError:
+                    start_idx = content.find('{', start_idx + 1)
             
-            if start_idx != -1 and end_idx != -1:
-                json_content = content[start_idx:end_idx]
-                result = json.loads(json_content)
-                return result
-            else:
-                raise ValueError("No valid JSON found in response")
+            raise ValueError("No valid JSON found in response")
                 
         except (json.JSONDecodeError, ValueError) as e:
-            print(f"[LANGUAGE] Failed to parse LLM response: {e}")
-            print(f"[LANGUAGE] Raw response: {content[:200]}...")
+            logger.warning("Failed to parse LLM response: %s", e)
+            logger.debug("Raw response: %.200s...", content)
             raise
     
     def _validate_language_result(self, result: Dict[str, Any], title: str, description: str, deliverable: str) -> Dict[str, Any]:
@@ -227,7 +265,7 @@ IMPORTANT:
         
         # Validate language exists
         if language not in self.supported_languages:
-            print(f"[LANGUAGE] Invalid language '{language}', defaulting to 'python'")
+            logger.warning("Invalid language '%s', defaulting to 'python'", language)
             language = 'python'
             confidence = 0.4
         
@@ -246,36 +284,21 @@ IMPORTANT:
         
         return enhanced_result
     
-    def _is_programming_task(self, title: str, description: str, deliverable: str) -> bool:
+    def _is_programming_text(self, combined_text: str) -> bool:
         """Quick check if this is a programming task."""
         
-        combined_text = f"{title} {description} {deliverable}".lower()
-        
-        programming_indicators = [
-            'code', 'program', 'script', 'app', 'application', 'software',
-            'build', 'create', 'develop', 'implement', 'api', 'system',
-            'web', 'game', 'calculator', 'tool', 'engine', 'framework'
-        ]
-        
-        non_programming_indicators = [
-            'write story', 'write poem', 'creative writing', 'essay',
-            'research report', 'documentation only', 'analysis report'
-        ]
-        
         # Check for non-programming first
-        if any(indicator in combined_text for indicator in non_programming_indicators):
+        if any(indicator in combined_text for indicator in _NON_PROGRAMMING_INDICATORS):
             return False
         
         # Check for programming indicators
-        return any(indicator in combined_text for indicator in programming_indicators)
+        return any(indicator in combined_text for indicator in _PROGRAMMING_INDICATORS)
     
-    def _fallback_language_classification(self, title: str, description: str, deliverable: str) -> Dict[str, Any]:
+    def _fallback_language_text(self, combined_text: str) -> Dict[str, Any]:
         """Simple fallback classification when LLM fails."""
         
-        combined_text = f"{title} {description} {deliverable}".lower()
-        
         # IMPROVED fallback with explicit checks
-        if any(word in combined_text for word in ['javascript', 'js', 'web', 'browser', 'html', 'canvas', 'html5']):
+        if any(word in combined_text for word in _FALLBACK_JAVASCRIPT_KEYWORDS):
             return {
                 'language': 'javascript',
                 'confidence': 0.8,
@@ -285,7 +308,7 @@ IMPORTANT:
                 'file_extension': '.js',
                 'execution_command': 'node'
             }
-        elif any(word in combined_text for word in ['java ', 'android', 'spring']):
+        elif any(word in combined_text for word in _FALLBACK_JAVA_KEYWORDS):
             return {
                 'language': 'java',
                 'confidence': 0.7,
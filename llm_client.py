@@ -5,8 +5,33 @@ Provides a unified interface for both Ollama and OpenAI-compatible API servers.
 This allows the framework to work with either local Ollama or remote OpenAI-compatible servers.
 """
 
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import re
+import threading
+import time
+
+from cache_db import open_cache_db
+
+logger = logging.getLogger(__name__)
+
+# Table for chat() responses in the response_cache_db file
+_CHAT_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS chat_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT,
+        created_at INTEGER
+    )
+"""
+
+# End-of-turn markers some models append after the final answer; the answer is
+# cut at the first one found
+_END_MARKER_RE = re.compile(r"<\|end\|>|<\|endoftext\|>|<\|eot_id\|>")
 
 
 class LLMClient:
@@ -19,7 +44,12 @@ class LLMClient:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         extract_final_answer: bool = True,
-        final_answer_marker: str = "<|start|>assistant<|channel|>final<|message|>"
+        final_answer_marker: str = "<|start|>assistant<|channel|>final<|message|>",
+        keep_alive: Optional[str] = None,
+        timeout: Optional[float] = None,
+        response_cache_size: int = 0,
+        response_cache_ttl: float = 3600,
+        response_cache_db: Optional[str] = None
     ):
         """
         Initialize LLM client.
@@ -28,15 +58,39 @@ class LLMClient:
             provider: "ollama" or "openai" (default: "openai")
             model: Model name to use
             api_key: API key (not needed for Ollama, optional for OpenAI-compatible)
-            base_url: Base URL for API (required for OpenAI-compatible servers)
+            base_url: Base URL for API (required for OpenAI-compatible servers, Ollama host otherwise)
             extract_final_answer: Whether to extract final answer from reasoning models (default: True)
             final_answer_marker: Marker that indicates start of final answer in reasoning models
+            keep_alive: How long Ollama keeps the model loaded between calls (e.g. "10m")
+            timeout: Seconds to wait for a response before giving up
+            response_cache_size: Identical chat() requests answered from memory (0 disables caching)
+            response_cache_ttl: Seconds a cached response stays valid
+            response_cache_db: SQLite file that keeps cached responses across runs
         """
         self.provider = provider.lower()
         self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
         self.extract_final_answer = extract_final_answer
         self.final_answer_marker = final_answer_marker
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+        self.timeout = timeout or float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+        self.response_cache_size = response_cache_size
+        self.response_cache_ttl = response_cache_ttl
+        self.response_cache_db = response_cache_db
 
+        self.client = self._create_client()
+        # with_options() copies share the SDK client and cache; only the original closes them
+        self._owns_transport = True
+        # Request hash -> (time, response), least recently used first
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_db = None
+        if response_cache_size:
+            self._cache_db = open_cache_db(response_cache_db, _CHAT_CACHE_DDL, "chat cache")
+
+    def _create_client(self):
+        """Create the provider SDK client."""
         if self.provider == "openai":
             try:
                 from openai import OpenAI
@@ -46,9 +100,10 @@ class LLMClient:
                 )
 
             # Initialize OpenAI client (works with OpenAI-compatible servers)
-            self.client = OpenAI(
-                api_key=api_key or os.getenv("OPENAI_API_KEY", "not-needed"),
-                base_url=base_url or os.getenv("OPENAI_BASE_URL")
+            return OpenAI(
+                api_key=self.api_key or os.getenv("OPENAI_API_KEY", "not-needed"),
+                base_url=self.base_url or os.getenv("OPENAI_BASE_URL"),
+                timeout=self.timeout
             )
 
         elif self.provider == "ollama":
@@ -59,10 +114,45 @@ class LLMClient:
                     "Ollama package not installed. Install with: pip install ollama"
                 )
 
-            self.client = ollama
+            # One client for the lifetime of this object so the HTTP connection is reused
+            # across calls; keep_alive keeps the model resident between requests.
+            # Tune OLLAMA_KEEP_ALIVE to roughly the length of a session.
+            return ollama.Client(host=self.base_url or os.getenv("OLLAMA_HOST"), timeout=self.timeout)
 
         else:
-            raise ValueError(f"Unknown provider: {provider}. Use 'ollama' or 'openai'")
+            raise ValueError(f"Unknown provider: {self.provider}. Use 'ollama' or 'openai'")
+
+    def with_options(self, **overrides) -> "LLMClient":
+        """
+        Copy of this client with some settings changed (e.g. extract_final_answer=False).
+
+        The copy shares the SDK client, so requests from both reuse the same
+        pooled connections instead of each opening their own.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.update(overrides)
+        clone._owns_transport = False
+        return clone
+
+    def close(self):
+        """Close the SDK client's pooled connections and cache database.
+
+        A no-op on with_options() copies; closing the original closes them for all copies.
+        """
+        if not self._owns_transport:
+            return
+        close = getattr(self.client, 'close', None)
+        if close is not None:
+            close()
+        # The cache database is shared process-wide and closed at exit
+        self._cache_db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _extract_final_answer_from_reasoning(self, content: str) -> str:
         """
@@ -81,22 +171,39 @@ class LLMClient:
         if not self.extract_final_answer or not self.final_answer_marker:
             return content
 
-        # Check if the marker exists in the content
-        if self.final_answer_marker in content:
-            # Extract everything after the marker
-            marker_pos = content.find(self.final_answer_marker)
-            final_answer = content[marker_pos + len(self.final_answer_marker):].strip()
+        # Everything after the marker, found in a single scan
+        _, marker, final_answer = content.partition(self.final_answer_marker)
 
-            # Some models may have additional markers at the end, clean them up
-            # Remove common end markers like <|end|> or similar
-            for end_marker in ["<|end|>", "<|endoftext|>", "<|eot_id|>"]:
-                if end_marker in final_answer:
-                    final_answer = final_answer.split(end_marker)[0].strip()
+        # If marker not found, return original content
+        if not marker:
+            return content
 
-            return final_answer
+        # Some models may have additional markers at the end, clean them up
+        # Remove common end markers like <|end|> or similar (one scan for all of them)
+        end = _END_MARKER_RE.search(final_answer)
+        if end:
+            final_answer = final_answer[:end.start()]
 
-        # If marker not found, return original content
-        return content
+        return final_answer.strip()
+
+    # OpenAI-style sampling arguments and their names in Ollama's options dict
+    OLLAMA_OPTION_NAMES = {
+        'max_tokens': 'num_predict',
+        'temperature': 'temperature',
+        'top_p': 'top_p',
+        'seed': 'seed',
+    }
+
+    def _ollama_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Adapt OpenAI-style keyword arguments to the Ollama chat API."""
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        options = dict(kwargs.get('options') or {})
+        for name, option in self.OLLAMA_OPTION_NAMES.items():
+            if name in kwargs:
+                options.setdefault(option, kwargs.pop(name))
+        if options:
+            kwargs['options'] = options
+        return kwargs
 
     def chat(
         self,
@@ -113,6 +220,71 @@ class LLMClient:
         Returns:
             Dict with 'message' key containing 'content' (Ollama-compatible format)
         """
+        if not self.response_cache_size:
+            return self._chat(messages, **kwargs)
+
+        key = self._cache_key(messages, kwargs)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        response = self._chat(messages, **kwargs)
+        self._cache_response(key, response)
+        return response
+
+    def _cache_key(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        # Everything that changes the returned content is part of the key
+        request = [self.provider, self.model, self.extract_final_answer, self.final_answer_marker, messages, kwargs]
+        return hashlib.blake2b(json.dumps(request, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+    def _cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """A copy of the cached response for key, or None if missing or expired."""
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._response_cache.get(key)
+            if hit is not None:
+                if now - hit[0] < self.response_cache_ttl:
+                    self._response_cache.move_to_end(key)
+                    return {**hit[1], 'message': dict(hit[1]['message'])}
+                del self._response_cache[key]
+
+            if self._cache_db is None:
+                return None
+            rows = self._cache_db.execute(
+                "SELECT response FROM chat_cache WHERE key = ? AND created_at > ?",
+                (key, int(time.time() - self.response_cache_ttl))
+            )
+            if not rows:
+                return None
+            response = json.loads(rows[0][0])
+            self._remember_response(key, now, response)
+        return {**response, 'message': dict(response['message'])}
+
+    def _cache_response(self, key: str, response: Dict[str, Any]):
+        # Only the fields callers read are kept, as plain JSON-serializable data
+        message = response['message']
+        response = {
+            'message': {'content': message['content'], 'role': message['role']},
+            'model': response['model'],
+            'reasoning_extracted': response.get('reasoning_extracted', False),
+        }
+        with self._cache_lock:
+            self._remember_response(key, time.monotonic(), response)
+            if self._cache_db is not None:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO chat_cache (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(response), int(time.time()))
+                )
+
+    def _remember_response(self, key: str, now: float, response: Dict[str, Any]):
+        # Caller holds _cache_lock
+        self._response_cache[key] = (now, response)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _chat(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """Send a chat request to the provider, bypassing the response cache."""
         if self.provider == "openai":
             # Call OpenAI-compatible API
             response = self.client.chat.completions.create(
@@ -140,6 +312,7 @@ class LLMClient:
 
         else:  # ollama
             # Call Ollama API (already in the right format)
+            kwargs = self._ollama_kwargs(kwargs)
             response = self.client.chat(
                 model=self.model,
                 messages=messages,
@@ -155,5 +328,109 @@ class LLMClient:
 
             return response
 
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async variant of chat() for callers running an event loop.
+
+        The blocking request runs in a worker thread over the shared SDK client,
+        so several requests can be in flight at once and reuse its connections.
+        """
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    def chat_until(
+        self,
+        messages: List[Dict[str, str]],
+        should_stop: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Stream a chat completion and stop generation as soon as it is no longer needed.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            should_stop: Called with each new chunk of streamed text; returning True
+                closes the stream so the server stops generating tokens
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            Dict in the same format as chat(), plus a 'stopped_early' flag
+        """
+        parts = []
+        stopped_early = False
+        role = 'assistant'
+
+        if self.provider == "openai":
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                **kwargs
+            )
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content or ''
+                    parts.append(text)
+                    if text and should_stop(text):
+                        stopped_early = True
+                        break
+            finally:
+                stream.close()
+
+        else:  # ollama
+            kwargs = self._ollama_kwargs(kwargs)
+            stream = self.client.chat(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                **kwargs
+            )
+            try:
+                for chunk in stream:
+                    text = chunk.get('message', {}).get('content', '')
+                    parts.append(text)
+                    if text and should_stop(text):
+                        stopped_early = True
+                        break
+            finally:
+                if hasattr(stream, 'close'):
+                    stream.close()
+
+        raw_content = ''.join(parts)
+        final_content = self._extract_final_answer_from_reasoning(raw_content)
+
+        return {
+            'message': {
+                'content': final_content,
+                'role': role
+            },
+            'model': self.model,
+            'reasoning_extracted': raw_content != final_content,
+            'stopped_early': stopped_early
+        }
+
+    def embed(self, text: str, model: str) -> List[float]:
+        """
+        Compute an embedding vector for text.
+
+        Args:
+            text: Text to embed
+            model: Embedding model name (e.g. "nomic-embed-text")
+
+        Returns:
+            Embedding as a list of floats
+        """
+        if self.provider == "openai":
+            response = self.client.embeddings.create(model=model, input=text)
+            return response.data[0].embedding
+
+        else:  # ollama
+            response = self.client.embeddings(model=model, prompt=text, keep_alive=self.keep_alive)
+            return response['embedding']
+
     def __repr__(self):
         return f"LLMClient(provider='{self.provider}', model='{self.model}')"
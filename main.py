@@ -15,8 +15,11 @@ Key improvements:
 - Adaptive planning that evolves with progress
 """
 
+import asyncio
+import atexit
 import time
 import sys
+from config import WORKER_CONCURRENCY
 from manager_agent import ManagerAgent
 from worker_agent import WorkerAgent
 
@@ -31,6 +34,7 @@ def main():
     # Initialize agents
     manager = ManagerAgent()
     worker = WorkerAgent()
+    atexit.register(worker.close)
     
     # Set up communication between manager and worker
     worker.set_task_completion_callback(manager.on_task_completed)
@@ -185,6 +189,9 @@ def execute_pending_tasks(worker: WorkerAgent, manager: ManagerAgent, project_id
     task_iteration = 0
     max_task_iterations = 15  # Increased for larger projects
     
+    if WORKER_CONCURRENCY > 1:
+        return execute_pending_tasks_concurrently(worker, manager, project_id, max_task_iterations)
+    
     while task_iteration < max_task_iterations:
         task_iteration += 1
         
@@ -222,6 +229,28 @@ def execute_pending_tasks(worker: WorkerAgent, manager: ManagerAgent, project_id
     
     return tasks_processed
 
+def execute_pending_tasks_concurrently(worker: WorkerAgent, manager: ManagerAgent, project_id: str, max_tasks: int) -> int:
+    """Execute pending tasks WORKER_CONCURRENCY at a time and return count of tasks processed."""
+    
+    print(f"\n[WORKER] Processing up to {max_tasks} tasks, {WORKER_CONCURRENCY} at a time...")
+    results = asyncio.run(worker.process_tasks(WORKER_CONCURRENCY, max_tasks))
+    
+    for task_result in results:
+        print(f"[WORKER] ✅ Completed: {task_result['title']}")
+        print(f"[WORKER] Success: {task_result['success']}")
+    
+    # Progress is checked once the batch has drained
+    evaluation = manager.evaluate_progress(project_id)
+    print(f"[PROGRESS] {evaluation.get('completion_percentage', 0):.0f}% complete")
+    print(f"[PROGRESS] Phase: {evaluation.get('current_phase', 'unknown')}")
+    if evaluation.get('status') == 'ready_for_validation':
+        print("[PROGRESS] Plan completed - ready for validation")
+    
+    if len(results) >= max_tasks:
+        print(f"[WORKER] Reached max task iterations ({max_tasks}) for this cycle")
+    
+    return len(results)
+
 def run_complexity_demo():
     """Demo showing how the system handles different complexity levels."""
     
@@ -296,6 +325,7 @@ def run_simple_test():
     
     manager = ManagerAgent()
     worker = WorkerAgent()
+    atexit.register(worker.close)
     worker.set_task_completion_callback(manager.on_task_completed)
     
     # Test with a moderate complexity objective
@@ -1,6 +1,6 @@
 import json
 from typing import List, Dict, Any, Optional
-from task_queue import TaskQueue, TaskStatus
+from task_queue import TaskStatus, shared_task_queue
 from project_planner import ProjectPlanner
 from llm_client import LLMClient
 from config import get_llm_config
@@ -19,7 +19,7 @@ class ManagerAgent:
             base_url=llm_config.get("base_url")
         )
 
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
         self.project_planner = ProjectPlanner(model_name)
         self.active_project_plans = {}  # Store project plans by project_id
     
@@ -29,40 +29,50 @@ class ManagerAgent:
         print(f"[MANAGER] Creating project: {project_name}")
         print(f"[MANAGER] Objective: {objective}")
         
-        # Create project in task queue
-        project_id = self.task_queue.create_project(project_name, objective)
-        
         # Phase 1: Create comprehensive project plan
         print(f"\n[MANAGER] Phase 1: Creating project plan...")
         project_plan = self.project_planner.create_project_plan(objective)
         
+        # Phase 2: Generate initial batch of tasks from the plan, stored together
+        # with the project in a single transaction
+        print(f"\n[MANAGER] Phase 2: Generating initial tasks...")
+        queue_tasks = self._queue_tasks_from_plan(project_plan)
+        project_id, _ = self.task_queue.create_project_with_tasks(project_name, objective, queue_tasks)
+        self._report_added_tasks(queue_tasks)
+        
         # Store the plan for this project
         self.active_project_plans[project_id] = project_plan
         
-        # Phase 2: Generate initial batch of tasks from the plan
-        print(f"\n[MANAGER] Phase 2: Generating initial tasks...")
-        self._generate_tasks_from_plan(project_id, project_plan)
-        
         return project_id
     
     def _generate_tasks_from_plan(self, project_id: str, project_plan: Dict[str, Any], max_tasks: int = 3):
         """Generate the next batch of tasks from the project plan."""
         
+        queue_tasks = self._queue_tasks_from_plan(project_plan, max_tasks)
+        for task in queue_tasks:
+            task['subtask_data']['project_id'] = project_id
+        
+        self.task_queue.add_tasks(queue_tasks)
+        self._report_added_tasks(queue_tasks)
+    
+    def _queue_tasks_from_plan(self, project_plan: Dict[str, Any], max_tasks: int = 3) -> List[Dict[str, Any]]:
+        """Convert the next ready plan tasks into queue tasks (without their project_id)."""
+        
         # Get next ready tasks from the plan
         next_tasks = self.project_planner.get_next_tasks_from_plan(project_plan, max_tasks)
         
         if not next_tasks:
             print(f"[MANAGER] No ready tasks found in plan")
-            return
+            return []
         
         print(f"[MANAGER] Adding {len(next_tasks)} tasks to queue")
         
         # Add tasks to queue with proper metadata
+        queue_tasks = []
         for task_data in next_tasks:
             # Convert plan task to queue task
             queue_task_data = {
                 'deliverable': task_data.get('deliverable', 'Implementation'),
-                'project_id': project_id,
                 'domain': task_data.get('domain', 'code'),
                 'objective': project_plan['metadata']['objective'],
                 'task_type': 'planned',
@@ -71,14 +81,18 @@ class ManagerAgent:
                 'dependencies': task_data.get('dependencies', [])
             }
             
-            task_id = self.task_queue.add_task(
-                title=task_data['title'],
-                description=task_data['description'],
-                subtask_data=queue_task_data,
-                priority=task_data.get('priority', 5)
-            )
-            
-            print(f"[MANAGER] Added task: {task_data['title']}")
+            queue_tasks.append({
+                'title': task_data['title'],
+                'description': task_data['description'],
+                'subtask_data': queue_task_data,
+                'priority': task_data.get('priority', 5)
+            })
+        
+        return queue_tasks
+    
+    def _report_added_tasks(self, queue_tasks: List[Dict[str, Any]]):
+        for task in queue_tasks:
+            print(f"[MANAGER] Added task: {task['title']}")
     
     def on_task_completed(self, project_id: str, completed_task: Dict[str, Any]) -> bool:
         """Handle task completion and generate next tasks if needed."""
@@ -264,12 +278,11 @@ class ManagerAgent:
                 improvement_data = json.loads(json_content)
                 
                 # Create improvement tasks with high priority
-                improvement_task_ids = []
-                for i, task in enumerate(improvement_data.get('improvement_tasks', [])):
-                    task_id = self.task_queue.add_task(
-                        title=task['title'],
-                        description=task['description'],
-                        subtask_data={
+                improvement_task_ids = self.task_queue.add_tasks([
+                    {
+                        'title': task['title'],
+                        'description': task['description'],
+                        'subtask_data': {
                             'deliverable': task['deliverable'],
                             'project_id': project_id,
                             'domain': task.get('domain', 'code'),
@@ -277,9 +290,10 @@ class ManagerAgent:
                             'task_type': 'improvement',
                             'addresses_issue': task.get('addresses_issue', 'user_satisfaction')
                         },
-                        priority=100 + i  # Very high priority for improvement tasks
-                    )
-                    improvement_task_ids.append(task_id)
+                        'priority': 100 + i  # Very high priority for improvement tasks
+                    }
+                    for i, task in enumerate(improvement_data.get('improvement_tasks', []))
+                ])
                 
                 print(f"[MANAGER] Generated {len(improvement_task_ids)} improvement tasks")
                 return improvement_task_ids
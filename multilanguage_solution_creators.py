@@ -1,23 +1,39 @@
 from llm_client import LLMClient
-from config import get_llm_config
+from config import get_llm_config, get_generation_options
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import re
+
+# Response parsing: explanation up to CODE:, then the first fenced block after it
+_SECTION_RE = re.compile(r'EXPLANATION:(?P<explanation>.*?)(?:CODE:(?P<code>.*)|\Z)', re.S)
+_FENCE_RE = re.compile(r'```(?:[^\n]*\n)?(?P<body>.*?)(?:```|\Z)', re.S)
+
+# Per-task part of the prompt; everything static goes in the per-language system message
+_TASK_PROMPT = """TASK: {title}
+DESCRIPTION: {description}
+DELIVERABLE: {deliverable}
+LANGUAGE: {language_name}
+
+{context}"""
 
 class MultiLanguageCodeSolutionCreator:
     """Code solution creator that adapts to different programming languages."""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm_client: Optional[LLMClient] = None):
         # Get LLM configuration
         llm_config = get_llm_config()
         self.model_name = model_name or llm_config["model"]
 
         # Initialize LLM client
-        self.llm_client = LLMClient(
-            provider=llm_config["provider"],
-            model=self.model_name,
-            api_key=llm_config.get("api_key"),
-            base_url=llm_config.get("base_url")
-        )
+        if llm_client is not None:
+            self.llm_client = llm_client.with_options(model=self.model_name)
+        else:
+            self.llm_client = LLMClient(
+                provider=llm_config["provider"],
+                model=self.model_name,
+                api_key=llm_config.get("api_key"),
+                base_url=llm_config.get("base_url")
+            )
         self.language_templates = {
             'javascript': {
                 'expert_role': 'senior JavaScript/Node.js developer',
@@ -160,25 +176,37 @@ class MultiLanguageCodeSolutionCreator:
                 'code_block': 'python'
             }
         }
+        self._system_prompts: Dict[str, str] = {}
+    
+    def create_solution_prompt(self, task: Dict[str, Any], language: str, context: str = "") -> Tuple[str, str]:
+        """Create a language-specific solution prompt as (system, user) messages."""
+        
+        template = self.language_templates.get(language, self.language_templates['python'])
+        
+        user_prompt = _TASK_PROMPT.format_map({
+            'title': task['title'],
+            'description': task['description'],
+            'deliverable': task['subtask_data'].get('deliverable', 'Working code'),
+            'language_name': template['language_name'],
+            'context': context
+        })
+
+        return self._system_prompt(language), user_prompt
     
-    def create_solution_prompt(self, task: Dict[str, Any], language: str, context: str = "") -> str:
-        """Create a language-specific solution prompt."""
+    def _system_prompt(self, language: str) -> str:
+        """Static instructions for a language, built once and reused verbatim."""
+        
+        system_prompt = self._system_prompts.get(language)
+        if system_prompt is not None:
+            return system_prompt
         
-        task_data = task['subtask_data']
         template = self.language_templates.get(language, self.language_templates['python'])
         
         # Build best practices string
         best_practices = '\n'.join(f'- {practice}' for practice in template['best_practices'])
         common_patterns = '\n'.join(f'- {pattern}' for pattern in template['common_patterns'])
         
-        prompt = f"""You are a {template['expert_role']} with expertise in production-quality code.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Working code')}
-LANGUAGE: {template['language_name']}
-
-{context}
+        system_prompt = f"""You are a {template['expert_role']} with expertise in production-quality code.
 
 Generate production-ready {template['language_name']} code that follows these best practices:
 {best_practices}
@@ -206,16 +234,22 @@ CODE:
 
 Focus on creating robust, idiomatic {template['language_name']} code that demonstrates expert-level understanding."""
 
-        return prompt
+        self._system_prompts[language] = system_prompt
+        return system_prompt
     
     def generate_solution(self, task: Dict[str, Any], language: str, context: str = "") -> Dict[str, Any]:
         """Generate solution for the specified programming language."""
         
-        prompt = self.create_solution_prompt(task, language, context)
+        system_prompt, prompt = self.create_solution_prompt(task, language, context)
         
         try:
+            # Byte-identical system message per language lets the server reuse its prefix cache
             response = self.llm_client.chat(
-                messages=[{"role": "user", "content": prompt}]
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                **get_generation_options()
             )
             
             content = response['message']['content']
@@ -231,44 +265,16 @@ Focus on creating robust, idiomatic {template['language_name']} code that demons
         """Extract solution from LLM response."""
         
         explanation = ""
-        solution = ""
-        
-        if "EXPLANATION:" in content:
-            parts = content.split("EXPLANATION:", 1)
-            if len(parts) > 1:
-                remaining = parts[1]
-                if "CODE:" in remaining:
-                    exp_code = remaining.split("CODE:", 1)
-                    explanation = exp_code[0].strip()
-                    code_section = exp_code[1].strip()
-                else:
-                    explanation = remaining.strip()
-                    code_section = ""
-            else:
-                code_section = content
-        else:
-            code_section = content
-        
-        # Extract code from markdown blocks - try language-specific first
-        template = self.language_templates.get(language, self.language_templates['python'])
-        code_block_name = template['code_block']
+        code_section = content
         
-        patterns_to_try = [
-            f"```{code_block_name}",
-            f"```{language}",
-            "```"
-        ]
+        section = _SECTION_RE.search(content)
+        if section:
+            explanation = section.group('explanation').strip()
+            code_section = (section.group('code') or "").strip()
         
-        for pattern in patterns_to_try:
-            if pattern in code_section:
-                code_start = code_section.find(pattern) + len(pattern)
-                code_end = code_section.find("```", code_start)
-                if code_end != -1:
-                    solution = code_section[code_start:code_end].strip()
-                    break
-                else:
-                    solution = code_section[code_start:].strip()
-                    break
+        # First fenced block, skipping its ```language line; unfenced output is taken as-is
+        fence = _FENCE_RE.search(code_section)
+        solution = fence.group('body').strip() if fence else ""
         
         if not solution:
             solution = code_section.strip()
@@ -4,7 +4,7 @@ from llm_client import LLMClient
 from config import get_llm_config
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from task_queue import TaskQueue
+from task_queue import shared_task_queue
 from project_folder_manager import ProjectFolderManager
 
 class ProjectCompletenessAgent:
@@ -22,7 +22,7 @@ class ProjectCompletenessAgent:
             api_key=llm_config.get("api_key"),
             base_url=llm_config.get("base_url")
         )
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
         self.project_manager = ProjectFolderManager()
     
     def perform_final_validation(self, project_id: str, objective: str) -> Dict[str, Any]:
@@ -1,15 +1,45 @@
 import os
+import re
 import json
+import stat
 import hashlib
+import tempfile
+import threading
 from typing import Dict, Any, List
 from datetime import datetime
 
+def _read_umask() -> int:
+    """The process umask, read without changing it where the OS allows."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    # os.umask can only be read by setting it; done once, at import
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+# For giving atomically written files the permissions open() would have
+_UMASK = _read_umask()
+
+# Anything but alphanumerics (as str.isalnum() defines them), space, '-' and '_'
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w \-]')
+
 class ProjectFolderManager:
     """Manages organized project folder structure for artifacts."""
     
     def __init__(self, base_artifacts_dir: str = "artifacts"):
         self.base_artifacts_dir = base_artifacts_dir
         self.projects_metadata_file = os.path.join(base_artifacts_dir, ".projects_metadata.json")
+        # Serializes folder creation and metadata read-modify-write between worker threads
+        self._lock = threading.Lock()
+        # Project folders already known to exist, so later saves skip the check
+        self._known_folders = set()
+        # (file signature, parsed metadata) from the last load or save; guarded by _lock
+        self._metadata_cache = None
         
         # Ensure base directory exists
         os.makedirs(base_artifacts_dir, exist_ok=True)
@@ -25,9 +55,13 @@ class ProjectFolderManager:
         project_folder_name = self._generate_project_folder_name(objective, project_id)
         project_folder_path = os.path.join(self.base_artifacts_dir, project_folder_name)
         
-        # Create project folder if it doesn't exist
-        if not os.path.exists(project_folder_path):
-            self._create_project_folder(project_folder_path, objective, project_id, task)
+        # Create project folder if it doesn't exist (checked once per folder)
+        if project_folder_path in self._known_folders:
+            return project_folder_path
+        with self._lock:
+            if not os.path.exists(project_folder_path):
+                self._create_project_folder(project_folder_path, objective, project_id, task)
+            self._known_folders.add(project_folder_path)
         
         return project_folder_path
     
@@ -57,7 +91,7 @@ class ProjectFolderManager:
         clean = text.lower()
         
         # Remove or replace problematic characters
-        clean = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in clean)
+        clean = _UNSAFE_FILENAME_CHARS_RE.sub('_', clean)
         
         # Replace multiple spaces/underscores with single underscore
         clean = '_'.join(clean.split())
@@ -133,8 +167,7 @@ Files in this project are automatically generated and organized by domain:
 *This project was created autonomously by an AI agent framework that breaks down objectives into manageable tasks and implements them with domain-specific expertise.*
 """
         
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        self._write_file(readme_path, readme_content)
     
     def _update_projects_metadata(self, project_folder_path: str, objective: str, project_id: str, task: Dict[str, Any]):
         """Update metadata about all projects."""
@@ -159,25 +192,77 @@ Files in this project are automatically generated and organized by domain:
         # Save metadata
         self._save_projects_metadata(metadata)
     
+    def _write_file(self, path: str, content: str):
+        """Write a file in one call, replacing it atomically.
+        
+        Content goes to a uniquely named sibling temp file that is then renamed
+        over path, so readers, crashes and concurrent writers never see a
+        half-written file.
+        """
+        
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f".{os.path.basename(path)}.")
+        try:
+            # mkstemp creates the file 0600; give it the mode open() would have
+            os.fchmod(fd, self._file_mode(path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def _metadata_file_signature(self):
+        """Identify the current metadata file version, or None if it doesn't exist.
+        
+        Saves replace the file, so any write (from this or another process)
+        changes the inode or mtime.
+        """
+        
+        try:
+            st = os.stat(self.projects_metadata_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    @staticmethod
+    def _file_mode(path: str) -> int:
+        """Permission bits for (re)writing path: the existing file's, else 0o666 minus the umask."""
+        
+        try:
+            return stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            return 0o666 & ~_UMASK
+    
     def _load_projects_metadata(self) -> Dict[str, Any]:
-        """Load projects metadata from file."""
+        """Load projects metadata from file.
         
-        if os.path.exists(self.projects_metadata_file):
-            try:
-                with open(self.projects_metadata_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        The file is only re-read when it changed since the last load or save.
+        Must be called with _lock held; the returned dict is the cached one.
+        """
+        
+        signature = self._metadata_file_signature()
+        if signature is None:
+            return {}
+        if self._metadata_cache is not None and self._metadata_cache[0] == signature:
+            return self._metadata_cache[1]
+        try:
+            with open(self.projects_metadata_file, 'r') as f:
+                metadata = json.load(f)
+        except:
+            return {}
+        self._metadata_cache = (signature, metadata)
+        return metadata
     
     def _save_projects_metadata(self, metadata: Dict[str, Any]):
         """Save projects metadata to file."""
         
         try:
-            with open(self.projects_metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            self._write_file(self.projects_metadata_file, json.dumps(metadata, indent=2))
         except Exception as e:
+            self._metadata_cache = None
             print(f"[PROJECT] Warning: Could not save metadata: {e}")
+        else:
+            self._metadata_cache = (self._metadata_file_signature(), metadata)
     
     def save_artifact_to_project(self, task: Dict[str, Any], solution: str, domain: str, language: str = None, objective: str = None) -> str:
         """Save an artifact to the appropriate project folder."""
@@ -194,11 +279,8 @@ Files in this project are automatically generated and organized by domain:
         
         # Save the artifact
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # Add header
-                f.write(self._generate_file_header(task, domain, language))
-                f.write('\n\n')
-                f.write(solution)
+            # Header, then the solution, in one write
+            self._write_file(filepath, f"{self._generate_file_header(task, domain, language)}\n\n{solution}")
             
             # Update project metadata
             self._update_project_file_count(project_folder, domain, language)
@@ -206,11 +288,17 @@ Files in this project are automatically generated and organized by domain:
             # Check if we should generate an entry point
             self._maybe_generate_entry_point(project_folder, domain, language, objective)
             
-            print(f"[PROJECT] Saved: {os.path.basename(project_folder)}/{filename}")
+            print(f"[PROJECT] Saved: {os.path.basename(project_folder)}/{os.path.basename(filepath)}")
             return filepath
             
         except Exception as e:
             print(f"[PROJECT] Error saving artifact: {e}")
+            # Release the reserved path unless the artifact made it to disk
+            try:
+                if os.path.getsize(filepath) == 0:
+                    os.unlink(filepath)
+            except OSError:
+                pass
             return ""
     
     def _maybe_generate_entry_point(self, project_folder: str, domain: str, language: str, objective: str):
@@ -355,8 +443,7 @@ Files in this project are automatically generated and organized by domain:
 </html>"""
         
         try:
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self._write_file(html_path, html_content)
             print(f"[PROJECT] Generated HTML entry point: index.html")
         except Exception as e:
             print(f"[PROJECT] Error generating HTML entry point: {e}")
@@ -437,8 +524,7 @@ if __name__ == "__main__":
 '''
         
         try:
-            with open(main_path, 'w', encoding='utf-8') as f:
-                f.write(main_content)
+            self._write_file(main_path, main_content)
             print(f"[PROJECT] Generated Python entry point: main.py")
         except Exception as e:
             print(f"[PROJECT] Error generating Python main: {e}")
@@ -492,19 +578,23 @@ if __name__ == "__main__":
         return filename
     
     def _ensure_unique_filepath(self, filepath: str) -> str:
-        """Ensure filepath is unique by adding number if needed."""
+        """Ensure filepath is unique by adding number if needed.
         
-        if not os.path.exists(filepath):
-            return filepath
+        The chosen path is reserved by creating it empty (O_EXCL), so concurrent
+        saves in this or another process never pick the same file.
+        """
         
-        # File exists, add number
         base, ext = os.path.splitext(filepath)
-        counter = 1
-        
-        while os.path.exists(f"{base}_{counter}{ext}"):
-            counter += 1
-        
-        return f"{base}_{counter}{ext}"
+        counter = 0
+        
+        with self._lock:
+            while True:
+                candidate = f"{base}_{counter}{ext}" if counter else filepath
+                try:
+                    os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+                    return candidate
+                except FileExistsError:
+                    counter += 1
     
     def _generate_file_header(self, task: Dict[str, Any], domain: str, language: str = None) -> str:
         """Generate appropriate file header."""
@@ -539,41 +629,43 @@ Generated: {timestamp}
     def _update_project_file_count(self, project_folder: str, domain: str, language: str = None):
         """Update project metadata with new file."""
         
-        metadata = self._load_projects_metadata()
-        folder_name = os.path.basename(project_folder)
-        
-        if folder_name in metadata:
-            project_info = metadata[folder_name]
-            project_info['file_count'] = project_info.get('file_count', 0) + 1
-            project_info['last_updated'] = datetime.now().isoformat()
-            
-            # Track domains and languages
-            if domain not in project_info.get('domains', []):
-                project_info.setdefault('domains', []).append(domain)
+        with self._lock:
+            metadata = self._load_projects_metadata()
+            folder_name = os.path.basename(project_folder)
             
-            if language and language not in project_info.get('languages', []):
-                project_info.setdefault('languages', []).append(language)
-            
-            self._save_projects_metadata(metadata)
+            if folder_name in metadata:
+                project_info = metadata[folder_name]
+                project_info['file_count'] = project_info.get('file_count', 0) + 1
+                project_info['last_updated'] = datetime.now().isoformat()
+                
+                # Track domains and languages
+                if domain not in project_info.get('domains', []):
+                    project_info.setdefault('domains', []).append(domain)
+                
+                if language and language not in project_info.get('languages', []):
+                    project_info.setdefault('languages', []).append(language)
+                
+                self._save_projects_metadata(metadata)
     
     def list_projects(self) -> List[Dict[str, Any]]:
         """List all projects with their metadata."""
         
-        metadata = self._load_projects_metadata()
-        projects = []
-        
-        for folder_name, info in metadata.items():
-            project_info = {
-                'name': folder_name,
-                'objective': info.get('objective', 'Unknown'),
-                'file_count': info.get('file_count', 0),
-                'domains': info.get('domains', []),
-                'languages': info.get('languages', []),
-                'created_at': info.get('created_at', 'Unknown'),
-                'last_updated': info.get('last_updated', 'Unknown'),
-                'folder_path': info.get('folder_path', '')
-            }
-            projects.append(project_info)
+        with self._lock:
+            metadata = self._load_projects_metadata()
+            projects = []
+            
+            for folder_name, info in metadata.items():
+                project_info = {
+                    'name': folder_name,
+                    'objective': info.get('objective', 'Unknown'),
+                    'file_count': info.get('file_count', 0),
+                    'domains': list(info.get('domains', [])),
+                    'languages': list(info.get('languages', [])),
+                    'created_at': info.get('created_at', 'Unknown'),
+                    'last_updated': info.get('last_updated', 'Unknown'),
+                    'folder_path': info.get('folder_path', '')
+                }
+                projects.append(project_info)
         
         # Sort by last updated
         projects.sort(key=lambda x: x['last_updated'], reverse=True)
@@ -3,7 +3,7 @@ import json
 import hashlib
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from task_queue import TaskQueue
+from task_queue import shared_task_queue
 
 class ProjectManager:
     """Manages project persistence and iterative development."""
@@ -11,7 +11,7 @@ class ProjectManager:
     def __init__(self, artifacts_dir: str = "artifacts"):
         self.artifacts_dir = artifacts_dir
         self.projects_dir = os.path.join(artifacts_dir, ".projects")
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
         
         # Create projects metadata directory
         os.makedirs(self.projects_dir, exist_ok=True)
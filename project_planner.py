@@ -1,3 +1,4 @@
+import heapq
 import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -412,11 +413,8 @@ Make the plan specific to THIS objective, not a generic template."""
             if dependencies_satisfied:
                 ready_tasks.append(task)
         
-        # Sort by priority (higher priority first)
-        ready_tasks.sort(key=lambda t: t.get('priority', 5), reverse=True)
-        
-        # Return up to max_tasks
-        return ready_tasks[:max_tasks]
+        # Up to max_tasks, higher priority first (ties keep plan order)
+        return heapq.nlargest(max_tasks, ready_tasks, key=lambda t: t.get('priority', 5))
     
     def mark_task_completed(self, project_plan: Dict[str, Any], task_id: str) -> Dict[str, Any]:
         """Mark a task as completed in the project plan."""
@@ -2,8 +2,9 @@ from llm_client import LLMClient
 from config import get_llm_config
 import os
 import json
+import hashlib
 from typing import Dict, Any, List, Optional
-from task_queue import TaskQueue, TaskStatus
+from task_queue import TaskStatus, shared_task_queue
 from context_manager import ContextManager
 from language_classifier import LanguageClassifier
 
@@ -22,7 +23,7 @@ class RefinementAgent:
             api_key=llm_config.get("api_key"),
             base_url=llm_config.get("base_url")
         )
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
         self.context_manager = ContextManager()
         self.language_classifier = LanguageClassifier()
         self.artifacts_dir = "artifacts"
@@ -83,13 +84,18 @@ class RefinementAgent:
                         with open(item_path, 'r', encoding='utf-8') as f:
                             content = f.read()
                         
-                        artifacts.append({
+                        artifact = {
                             'name': item,
                             'path': item_path,
                             'content': content,
+                            'content_hash': hashlib.blake2b(content.encode(), digest_size=16).hexdigest(),
                             'size': len(content),
                             'type': self._classify_file_type(item, content)
-                        })
+                        }
+                        # Lowercase once here so the pattern-based analyzers don't each copy the file
+                        if any(keyword in artifact['type'] for keyword in ['code', 'html', 'css']):
+                            artifact['content_lower'] = content.lower()
+                        artifacts.append(artifact)
                     except Exception as e:
                         print(f"[REFINEMENT] Could not read {item}: {e}")
         
@@ -154,9 +160,16 @@ OBJECTIVE: {project_context['project_state']['objective'] if project_context['pr
 CODE FILES TO ANALYZE:
 """
         
-        for file_info in code_files[:5]:  # Analyze up to 5 files
+        # Collapse files with identical content into a single prompt entry
+        file_groups = {}
+        for file_info in code_files:
+            file_groups.setdefault(file_info['content_hash'], []).append(file_info)
+        
+        for group in list(file_groups.values())[:5]:  # Analyze up to 5 distinct files
+            file_info = group[0]
+            duplicates = f" (also: {', '.join(dup['name'] for dup in group[1:])})" if len(group) > 1 else ""
             analysis_prompt += f"""
-FILE: {file_info['name']} ({file_info['type']})
+FILE: {file_info['name']} ({file_info['type']}){duplicates}
 ```
 {file_info['content'][:2000]}{'...' if len(file_info['content']) > 2000 else ''}
 ```
@@ -283,7 +296,7 @@ Respond in JSON format:
         ux_recommendations = []
         
         for file_info in ui_files:
-            content = file_info['content'].lower()
+            content = file_info['content_lower']
             
             # Check for common UX patterns
             if 'tkinter' in content:
@@ -366,7 +379,7 @@ Respond in JSON format:
         recommendations = []
         
         for file_info in code_files:
-            content = file_info['content'].lower()
+            content = file_info['content_lower']
             
             # Check for common performance anti-patterns
             if 'for' in content and 'for' in content[content.find('for')+10:]:
@@ -606,38 +619,31 @@ Respond in JSON format:
         
         # Add critical improvements as high-priority tasks
         for improvement in improvement_plan['critical_improvements']:
-            task_title = f"Critical Fix: {improvement['recommendation']}"
-            task_description = f"Address critical {improvement['category']} issue: {improvement['recommendation']}"
-            
-            task_id = self.task_queue.add_task(
-                title=task_title,
-                description=task_description,
-                subtask_data={
+            refinement_tasks.append({
+                'title': f"Critical Fix: {improvement['recommendation']}",
+                'description': f"Address critical {improvement['category']} issue: {improvement['recommendation']}",
+                'subtask_data': {
                     'deliverable': 'Improved code/functionality',
                     'project_id': project_id,
                     'refinement_type': 'critical',
                     'category': improvement['category']
                 },
-                priority=10
-            )
-            refinement_tasks.append(task_id)
+                'priority': 10
+            })
         
         # Add important improvements as medium-priority tasks
         for improvement in improvement_plan['important_improvements'][:3]:  # Limit to 3
-            task_title = f"Improve: {improvement['recommendation']}"
-            task_description = f"Enhance {improvement['category']}: {improvement['recommendation']}"
-            
-            task_id = self.task_queue.add_task(
-                title=task_title,
-                description=task_description,
-                subtask_data={
+            refinement_tasks.append({
+                'title': f"Improve: {improvement['recommendation']}",
+                'description': f"Enhance {improvement['category']}: {improvement['recommendation']}",
+                'subtask_data': {
                     'deliverable': 'Enhanced functionality',
                     'project_id': project_id,
                     'refinement_type': 'improvement',
                     'category': improvement['category']
                 },
-                priority=7
-            )
-            refinement_tasks.append(task_id)
+                'priority': 7
+            })
         
-        return refinement_tasks
\ No newline at end of file
+        # One transaction for the whole set of refinement tasks
+        return self.task_queue.add_tasks(refinement_tasks)
\ No newline at end of file
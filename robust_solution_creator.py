@@ -1,156 +1,137 @@
-from typing import Dict, Any, List, Optional
-from solution_creators import SolutionCreatorFactory, BaseSolutionCreator
+import functools
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from solution_creators import StreamingExtractor
 from multilanguage_solution_creators import MultiLanguageCodeSolutionCreator
 from language_classifier import LanguageClassifier
 from llm_client import LLMClient
-from config import get_llm_config
-
-class RobustSolutionCreator:
-    """Robust solution creator with fallback mechanisms, hybrid support, and multi-language capabilities."""
-
-    def __init__(self, model_name: str = None):
-        # Get LLM configuration
-        llm_config = get_llm_config()
-        self.model_name = model_name or llm_config["model"]
-
-        # Initialize LLM client
-        self.llm_client = LLMClient(
-            provider=llm_config["provider"],
-            model=self.model_name,
-            api_key=llm_config.get("api_key"),
-            base_url=llm_config.get("base_url")
-        )
-
-        self.language_classifier = LanguageClassifier()
-        self.multilang_code_creator = MultiLanguageCodeSolutionCreator(model_name)
-        self.fallback_attempts = 0
-        self.max_fallback_attempts = 2
-    
-    def create_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str = "") -> Dict[str, Any]:
-        """Create solution with robust fallback handling and multi-language support."""
-        
-        approach = classification.get('approach', 'specialized')
-        domain = classification.get('primary_domain', 'code')
-        
-        # For code tasks, detect programming language
-        language_info = None
-        if domain in ['code', 'ui', 'data', 'game']:
-            language_info = self._detect_language_with_context(task)
-            print(f"[LANGUAGE] Detected: {language_info['language']} (confidence: {language_info['confidence']:.2f})")
-            if language_info.get('reasoning'):
-                print(f"[LANGUAGE] {language_info['reasoning']}")
-        
-        try:
-            if approach == 'generic_fallback':
-                return self._create_generic_solution(task, context, classification.get('fallback_reason'))
-            elif approach == 'specialized_cautious':
-                return self._create_cautious_solution(task, classification, context, language_info)
-            elif approach == 'hybrid':
-                return self._create_hybrid_solution(task, classification, context, language_info)
-            else:
-                return self._create_specialized_solution(task, classification, context, language_info)
-                
-        except Exception as e:
-            # Fallback to generic approach on any error
-            print(f"[ROBUST] Specialized approach failed: {e}")
-            return self._create_generic_solution(task, context, f"Specialized approach failed: {e}")
-    
-    def _detect_language_with_context(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Detect language using both task and original objective context."""
-        
-        # Get the original objective from task metadata
-        objective = task.get('subtask_data', {}).get('objective', '')
-        
-        # Create enhanced task context that includes the original objective
-        enhanced_task = {
-            'title': f"{task['title']} (from project: {objective})",
-            'description': f"{task['description']}. Original project objective: {objective}",
-            'subtask_data': task.get('subtask_data', {})
-        }
-        
-        # Run language classification on the enhanced context
-        return self.language_classifier.classify_language(enhanced_task)
-    
-    def _create_specialized_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str, language_info: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Create solution using specialized domain approach with language awareness."""
-        
-        domain = classification['primary_domain']
-        
-        try:
-            # For code domains with language detection, use multi-language creator
-            if domain in ['code', 'ui', 'data', 'game'] and language_info and language_info.get('is_programming_task'):
-                language = language_info['language']
-                print(f"[ROBUST] Using multi-language creator for {language}")
-                result = self.multilang_code_creator.generate_solution(task, language, context)
-                if result['success']:
-                    result['approach_used'] = 'specialized_multilang'
-                    result['domain'] = domain
-                    result['language'] = language
-                    print(f"[ROBUST] Multi-language solution generated successfully")
-                return result
-            else:
-                # Use traditional domain-specific approach with SAFE prompting
-                print(f"[ROBUST] Using safe domain solution for {domain}")
-                result = self._create_safe_domain_solution(task, domain, context)
-                if result['success']:
-                    result['approach_used'] = 'specialized'
-                    result['domain'] = domain
-                    if language_info:
-                        result['language'] = language_info.get('language', 'python')
-                return result
-                
-        except Exception as e:
-            # Fallback to cautious approach
-            print(f"[ROBUST] Specialized creation failed, trying cautious approach: {e}")
-            return self._create_cautious_solution(task, classification, context, language_info)
-    
-    def _create_safe_domain_solution(self, task: Dict[str, Any], domain: str, context: str) -> Dict[str, Any]:
-        """Create domain-specific solution with safety guardrails."""
-        
-        task_data = task['subtask_data']
-        
-        # Create SAFE, domain-specific prompts
-        if domain == 'code':
-            prompt = self._create_safe_code_prompt(task, context)
-        elif domain == 'creative':
-            prompt = self._create_safe_creative_prompt(task, context)
-        elif domain == 'data':
-            prompt = self._create_safe_data_prompt(task, context)
-        elif domain == 'game':
-            prompt = self._create_safe_game_prompt(task, context)
-        elif domain == 'ui':
-            prompt = self._create_safe_ui_prompt(task, context)
-        elif domain == 'research':
-            prompt = self._create_safe_research_prompt(task, context)
-        else:
-            prompt = self._create_safe_code_prompt(task, context)  # Default to code
-        
-        try:
-            response = self.llm_client.chat(
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            content = response['message']['content']
-            return self._extract_solution(content)
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Error generating {domain} solution: {str(e)}'
-            }
-    
-    def _create_safe_code_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe code generation prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a senior software engineer creating safe, executable Python code.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Working code')}
-
-{context}
+from cache_db import open_cache_db
+from config import (get_llm_config, get_generation_options, LLM_MAX_CONCURRENCY, EMBEDDING_MODEL,
+                    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, RESPONSE_CACHE_DB,
+                    RESPONSE_CACHE_MAX_AGE_DAYS, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL,
+                    TEMPLATE_SOLUTIONS)
+
+logger = logging.getLogger(__name__)
+
+# Performance note: every solution path here is dominated by the LLM round-trip
+# (network + remote token generation), not by Python-level work. There are no
+# numeric loops or array kernels in this module, so JIT/vectorization tricks
+# cannot move the needle. Optimization effort belongs in I/O concurrency,
+# prompt/response caching and shorter generations, all of which hang off
+# _invoke_llm().
+
+# Table for confirmed solutions in RESPONSE_CACHE_DB; tag is the domain
+_RESPONSE_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        prompt TEXT,
+        response TEXT,
+        created_at INTEGER,
+        tag TEXT
+    )
+"""
+
+# Solutions remembered for report_execution; older ones are never confirmed
+_MAX_UNCONFIRMED = 256
+
+# Domains whose solutions are programs and therefore get language detection
+_CODE_DOMAINS = frozenset({'code', 'ui', 'data', 'game'})
+
+# Response parsing: the explanation runs up to the first CODE:/CONTENT:/SOLUTION:
+# marker (or to the end if there is none); the solution is the body of the first
+# fenced block in the section after it, skipping the ```language line.
+_SECTION_MARKERS = ("CODE:", "CONTENT:", "SOLUTION:")
+_SECTION_RE = re.compile(r'EXPLANATION:(?P<explanation>.*?)(?:(?:CODE|CONTENT|SOLUTION):(?P<section>.*)|\Z)', re.S)
+_FENCE_RE = re.compile(r'```(?:[^\n]*\n)?(?P<body>.*?)(?:```|\Z)', re.S)
+
+# Prompts are split into a static system message and a per-task user message.
+# The system text is byte-identical across calls, so the server can reuse its
+# cached prefix; the task fields come last and are filled with str.format_map.
+
+# Section marker that precedes the fenced answer in each domain's response format.
+# Research output is markdown that may itself contain fences, so it isn't cut short.
+_STREAM_MARKERS = {
+    'code': "CODE:",
+    'data': "CODE:",
+    'game': "CODE:",
+    'ui': "CODE:",
+    'creative': "CONTENT:",
+    'research': None,
+}
+
+# Prebaked Python for trivial, well-known tasks: generating these with the LLM
+# costs seconds and adds nothing. Opt-in (TEMPLATE_SOLUTIONS), and only used when
+# no other language is requested and the task asks for nothing beyond the title.
+_TEMPLATE_SOLUTIONS = [
+    (re.compile(r'\bfizz\s*buzz\b', re.I), 'FizzBuzz printed for 1 to 100.', """def fizzbuzz(n):
+    if n % 15 == 0:
+        return "FizzBuzz"
+    if n % 3 == 0:
+        return "Fizz"
+    if n % 5 == 0:
+        return "Buzz"
+    return str(n)
+
+print("Demonstrating: " + TITLE)
+for i in range(1, 101):
+    print(fizzbuzz(i))
+"""),
+    (re.compile(r'\bhello,?\s+world\b', re.I), 'Prints the classic greeting.', """print("Demonstrating: " + TITLE)
+print("Hello, World!")
+"""),
+    (re.compile(r'\bfactorial\b', re.I), 'Iterative factorial with input validation.', """def factorial(n):
+    if not isinstance(n, int) or n < 0:
+        raise ValueError("factorial is only defined for non-negative integers")
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+print("Demonstrating: " + TITLE)
+for n in [0, 1, 5, 10]:
+    print(f"{n}! = {factorial(n)}")
+"""),
+    (re.compile(r'\bfibonacci\b', re.I), 'Iterative Fibonacci sequence generator.', """def fibonacci(count):
+    sequence = []
+    a, b = 0, 1
+    for _ in range(count):
+        sequence.append(a)
+        a, b = b, a + b
+    return sequence
+
+print("Demonstrating: " + TITLE)
+print("First 20 Fibonacci numbers:", fibonacci(20))
+"""),
+]
+
+# Words a template task's description or deliverable may use; anything else
+# ("API", "recursive", "memoized", ...) is a requirement the template doesn't meet
+_TEMPLATE_FILLER_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'of', 'to', 'from', 'for', 'in', 'that', 'with', 'up',
+    'write', 'create', 'make', 'implement', 'print', 'prints', 'show', 'shows', 'display',
+    'compute', 'computes', 'calculate', 'calculates', 'generate', 'generates',
+    'program', 'script', 'code', 'working', 'simple', 'basic', 'classic', 'python',
+    'number', 'numbers', 'sequence', 'series', 'first', 'n', '1', '10', '20', '100',
+})
+
+# The task fields are what the semantic cache compares; whatever follows them
+# (project context, fallback reason) has to match exactly for a cache hit.
+_TASK_HEADER = """TASK: {title}
+DESCRIPTION: {description}
+DELIVERABLE: {deliverable}"""
+_TASK_PROMPT = _TASK_HEADER + """
+
+{context}"""
+
+_SAFE_CODE_SYSTEM = """You are a senior software engineer creating safe, executable Python code.
 
 CRITICAL SAFETY REQUIREMENTS:
 1. Create ONLY standard Python code using built-in libraries
@@ -186,19 +167,8 @@ Use: name = "Sample User"  # demo data
 
 Instead of: while True: ...
 Use: for i in range(5): ...  # bounded loop"""
-    
-    def _create_safe_creative_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe creative writing prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a professional creative writer.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Creative content')}
 
-{context}
+_SAFE_CREATIVE_SYSTEM = """You are a professional creative writer.
 
 Create engaging creative content that:
 - Is complete and self-contained
@@ -215,19 +185,8 @@ CONTENT:
 ```text
 [Your complete creative content]
 ```"""
-    
-    def _create_safe_data_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe data analysis prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a data scientist creating self-contained analysis code.
 
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Data analysis')}
-
-{context}
+_SAFE_DATA_SYSTEM = """You are a data scientist creating self-contained analysis code.
 
 SAFETY REQUIREMENTS:
 1. Create sample data instead of loading external files
@@ -251,19 +210,8 @@ CODE:
 # Self-contained data analysis with sample data
 [Your complete code with built-in sample data]
 ```"""
-    
-    def _create_safe_game_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe game development prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a game developer creating a demonstration game.
 
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Game code')}
-
-{context}
+_SAFE_GAME_SYSTEM = """You are a game developer creating a demonstration game.
 
 SAFETY REQUIREMENTS:
 1. Create a text-based game demonstration
@@ -287,19 +235,8 @@ CODE:
 # Text-based game demonstration
 [Your complete game code with demo mode]
 ```"""
-    
-    def _create_safe_ui_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe UI development prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a UI developer creating a simple interface demonstration.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'User interface')}
 
-{context}
+_SAFE_UI_SYSTEM = """You are a UI developer creating a simple interface demonstration.
 
 Create a simple text-based interface demonstration that:
 - Shows the UI structure and flow
@@ -316,19 +253,8 @@ CODE:
 # Text-based UI demonstration
 [Your complete interface simulation code]
 ```"""
-    
-    def _create_safe_research_prompt(self, task: Dict[str, Any], context: str) -> str:
-        """Create a safe research content prompt."""
-        
-        task_data = task['subtask_data']
-        
-        return f"""You are a professional researcher creating comprehensive documentation.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Research document')}
 
-{context}
+_SAFE_RESEARCH_SYSTEM = """You are a professional researcher creating comprehensive documentation.
 
 Create well-structured research content that:
 - Presents information clearly and objectively
@@ -344,84 +270,8 @@ CONTENT:
 ```markdown
 [Your complete research document]
 ```"""
-    
-    def _extract_solution(self, content: str) -> Dict[str, Any]:
-        """Extract solution from LLM response."""
-        
-        explanation = ""
-        solution = ""
-        
-        if "EXPLANATION:" in content:
-            parts = content.split("EXPLANATION:", 1)
-            if len(parts) > 1:
-                remaining = parts[1]
-                if any(marker in remaining for marker in ["CODE:", "CONTENT:", "SOLUTION:"]):
-                    for marker in ["CODE:", "CONTENT:", "SOLUTION:"]:
-                        if marker in remaining:
-                            exp_sol = remaining.split(marker, 1)
-                            explanation = exp_sol[0].strip()
-                            solution_section = exp_sol[1].strip()
-                            break
-                else:
-                    explanation = remaining.strip()
-                    solution_section = ""
-            else:
-                solution_section = content
-        else:
-            solution_section = content
-        
-        # Extract from markdown blocks
-        if "```" in solution_section:
-            start_idx = solution_section.find("```")
-            # Skip the opening ```language
-            newline_idx = solution_section.find("\n", start_idx)
-            if newline_idx != -1:
-                start_idx = newline_idx + 1
-            else:
-                start_idx = start_idx + 3
-                
-            end_idx = solution_section.find("```", start_idx)
-            if end_idx != -1:
-                solution = solution_section[start_idx:end_idx].strip()
-            else:
-                solution = solution_section[start_idx:].strip()
-        else:
-            solution = solution_section.strip()
-        
-        if not solution:
-            return {
-                'success': False,
-                'error': 'No solution content generated'
-            }
-        
-        return {
-            'success': True,
-            'solution': solution,
-            'explanation': explanation
-        }
-    
-    def _create_cautious_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str, language_info: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Create solution using cautious approach."""
-        return self._create_specialized_solution(task, classification, context, language_info)
-    
-    def _create_hybrid_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str, language_info: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Create solution for hybrid tasks."""
-        return self._create_specialized_solution(task, classification, context, language_info)
-    
-    def _create_generic_solution(self, task: Dict[str, Any], context: str, reason: str = None) -> Dict[str, Any]:
-        """Create solution using generic, ultra-safe approach."""
-        
-        task_data = task['subtask_data']
-        
-        generic_prompt = f"""You are tasked with creating a simple, safe demonstration.
-
-TASK: {task['title']}
-DESCRIPTION: {task['description']}
-DELIVERABLE: {task_data.get('deliverable', 'Working solution')}
-
-{context}
 
-{"FALLBACK REASON: " + reason if reason else ""}
+_GENERIC_SYSTEM = """You are tasked with creating a simple, safe demonstration.
 
 Create a minimal Python demonstration that:
 1. Uses ONLY built-in Python features (no imports except: os, sys, json, time, math, random)
@@ -437,7 +287,7 @@ EXPLANATION:
 SOLUTION:
 ```python
 # Ultra-safe demonstration code
-print("Demonstrating: {task['title']}")
+print("Demonstrating: [task title]")
 
 # Your safe implementation here
 # Use only built-in Python features
@@ -449,16 +299,550 @@ print("Demonstration complete")
 
 Focus on creating a working example that runs without any issues."""
 
-        try:
-            response = self.llm_client.chat(
-                messages=[{"role": "user", "content": generic_prompt}]
+# Per-domain system prompt and the deliverable assumed when a task doesn't name one
+_SAFE_PROMPTS = {
+    'code': (_SAFE_CODE_SYSTEM, 'Working code'),
+    'creative': (_SAFE_CREATIVE_SYSTEM, 'Creative content'),
+    'data': (_SAFE_DATA_SYSTEM, 'Data analysis'),
+    'game': (_SAFE_GAME_SYSTEM, 'Game code'),
+    'ui': (_SAFE_UI_SYSTEM, 'User interface'),
+    'research': (_SAFE_RESEARCH_SYSTEM, 'Research document'),
+}
+
+class RobustSolutionCreator:
+    """Robust solution creator with fallback mechanisms, hybrid support, and multi-language capabilities."""
+
+    def __init__(self, model_name: str = None, llm_client: Optional[LLMClient] = None):
+        # Get LLM configuration
+        llm_config = get_llm_config()
+        self.model_name = model_name or llm_config["model"]
+
+        # Initialize LLM client
+        if llm_client is not None:
+            self.llm_client = llm_client.with_options(model=self.model_name)
+        else:
+            self.llm_client = LLMClient(
+                provider=llm_config["provider"],
+                model=self.model_name,
+                api_key=llm_config.get("api_key"),
+                base_url=llm_config.get("base_url")
             )
+        # Solution requests go out as soon as they arrive, at most LLM_MAX_CONCURRENCY at once
+        self._request_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+        self.language_classifier = LanguageClassifier(llm_client=self.llm_client)
+        # Retried tasks re-run language detection with identical inputs; remember recent answers
+        self._classify_language_cached = functools.lru_cache(maxsize=64)(self._classify_language)
+        self.multilang_code_creator = MultiLanguageCodeSolutionCreator(model_name, llm_client=self.llm_client)
+        # Language detection runs here while the safe-domain prompt is being built
+        self._executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY)
+        # Identical prompts issued concurrently share one LLM request
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Solutions for previous prompts, least recently used first: exact prompt hash ->
+        # (time, domain, result), and the same hash -> (time, (model, domain, context hash),
+        # embedding, norm, result) for near-duplicate tasks
+        self._response_cache: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._semantic_cache: "OrderedDict[str, Tuple[float, tuple, List[float], float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._response_db = open_cache_db(RESPONSE_CACHE_DB, _RESPONSE_CACHE_DDL, "response cache")
+        # Solutions handed out but not yet run: solution -> (key, prompt, domain, tag, result).
+        # They only reach the persistent cache once report_execution confirms they worked.
+        self._unconfirmed: "OrderedDict[str, Tuple[Optional[str], str, str, Optional[tuple], Dict[str, Any]]]" = OrderedDict()
+        self._semantic_cache_enabled = SEMANTIC_CACHE_THRESHOLD <= 1
+        # Consecutive failed generic fallbacks; at max_fallback_attempts, fallbacks pause
+        # for fallback_cooldown seconds and then get one more try
+        self.fallback_attempts = 0
+        self.max_fallback_attempts = 2
+        self.fallback_cooldown = 60.0
+        self._fallback_retry_at = 0.0
+    
+    def close(self):
+        """Stop the background executor and close the LLM client."""
+        
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # The cache database is shared process-wide and closed at exit
+        self._response_db = None
+        self.llm_client.close()
+    
+    def create_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str = "") -> Dict[str, Any]:
+        """Create solution with robust fallback handling and multi-language support."""
+        
+        approach = classification.get('approach', 'specialized')
+        domain = classification.get('primary_domain', 'code')
+        
+        if TEMPLATE_SOLUTIONS and domain == 'code' and approach != 'generic_fallback':
+            template_result = self._try_template_solution(task, domain)
+            if template_result is not None:
+                return template_result
+        
+        try:
+            if approach == 'generic_fallback':
+                return self._create_generic_solution(task, context, classification.get('fallback_reason'))
+            
+            # For code tasks, detect programming language in the background
+            language_future = None
+            if domain in _CODE_DOMAINS:
+                language_future = self._executor.submit(self._detect_language_with_context, task)
+            
+            # 'specialized', 'specialized_cautious' and 'hybrid' all use the specialized path
+            result = self._create_specialized_solution(task, classification, context, language_future)
+                
+        except Exception as e:
+            # Once consecutive fallbacks keep failing too, the cause is likely not the
+            # approach (e.g. the server is down); stop paying for a second LLM call per
+            # task for a while, then let the next failing task try the fallback again
+            if self.fallback_attempts >= self.max_fallback_attempts and time.monotonic() < self._fallback_retry_at:
+                logger.warning("Specialized approach failed, fallback paused: %s", e)
+                return {
+                    'success': False,
+                    'error': f'Specialized approach failed: {e} (fallback paused after repeated failures)'
+                }
+            
+            # Fallback to generic approach on any error
+            logger.warning("Specialized approach failed: %s", e)
+            result = self._create_generic_solution(task, context, f"Specialized approach failed: {e}")
+            if result['success']:
+                self.fallback_attempts = 0
+            else:
+                self.fallback_attempts += 1
+                if self.fallback_attempts >= self.max_fallback_attempts:
+                    self._fallback_retry_at = time.monotonic() + self.fallback_cooldown
+            return result
+        
+        self.fallback_attempts = 0
+        return result
+    
+    def _try_template_solution(self, task: Dict[str, Any], domain: str) -> Optional[Dict[str, Any]]:
+        """Return a prebaked solution for trivial tasks, or None to use the LLM."""
+        
+        title = task.get('title', '')
+        # Short titles only: "Calculator with factorial and history" is not a factorial task
+        if len(title.split()) > 5:
+            return None
+        for pattern, explanation, template in _TEMPLATE_SOLUTIONS:
+            if pattern.search(title):
+                break
+        else:
+            return None
+        
+        # The description and deliverable may only restate the title: "Fibonacci API"
+        # described as an HTTP endpoint is not the canned script
+        description = task.get('description', '')
+        deliverable = task.get('subtask_data', {}).get('deliverable', '')
+        allowed = _TEMPLATE_FILLER_WORDS | set(re.findall(r'[a-z0-9]+', title.lower()))
+        if not set(re.findall(r'[a-z0-9]+', f"{description} {deliverable}".lower())) <= allowed:
+            return None
+        
+        explicit = self.language_classifier.check_explicit_language_mentions(title, description, deliverable)
+        if explicit and explicit['language'] != 'python':
+            return None
+        
+        logger.info("Using template solution for '%s'", title)
+        return {
+            'success': True,
+            'solution': f"TITLE = {title!r}\n\n" + template,
+            'explanation': explanation,
+            'approach_used': 'template',
+            'domain': domain,
+            'language': 'python'
+        }
+    
+    def _detect_language_with_context(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Detect language using both task and original objective context."""
+        
+        # Get the original objective from task metadata
+        subtask_data = task.get('subtask_data', {})
+        objective = subtask_data.get('objective', '')
+        
+        # Cached on the fields classification actually reads, so retries skip the LLM call
+        result = self._classify_language_cached(
+            task['title'], task['description'], subtask_data.get('deliverable', ''), objective
+        )
+        return dict(result)
+    
+    def _classify_language(self, title: str, description: str, deliverable: str, objective: str) -> Dict[str, Any]:
+        """Run language classification on the task enhanced with its project objective."""
+        
+        if objective:
+            # Create enhanced task context that includes the original objective
+            title = f"{title} (from project: {objective})"
+            description = f"{description}. Original project objective: {objective}"
+        
+        enhanced_task = {
+            'title': title,
+            'description': description,
+            'subtask_data': {'deliverable': deliverable}
+        }
+        
+        # Run language classification on the enhanced context
+        return self.language_classifier.classify_language(enhanced_task)
+    
+    def _create_specialized_solution(self, task: Dict[str, Any], classification: Dict[str, Any], context: str, language_future: Optional[Future] = None) -> Dict[str, Any]:
+        """Create solution using specialized domain approach with language awareness."""
+        
+        domain = classification['primary_domain']
+        
+        # The safe prompt doesn't depend on the language, so build it while detection runs
+        system_prompt, task_text, prompt = self._create_safe_domain_prompt(task, domain, context)
+        
+        language_info = None
+        if language_future is not None:
+            language_info = language_future.result()
+            logger.debug("Detected language: %s (confidence: %.2f)", language_info['language'], language_info['confidence'])
+            if language_info.get('reasoning'):
+                logger.debug("Language reasoning: %s", language_info['reasoning'])
+        
+        # LLM errors are already turned into {'success': False} results below; anything
+        # else propagates to create_solution, which falls back to the generic approach
+        if domain in _CODE_DOMAINS and language_info and language_info.get('is_programming_task'):
+            # For code domains with language detection, use multi-language creator
+            language = language_info['language']
+            logger.info("Using multi-language creator for %s", language)
+            result = self.multilang_code_creator.generate_solution(task, language, context)
+            if result['success']:
+                result['approach_used'] = 'specialized_multilang'
+                result['domain'] = domain
+                result['language'] = language
+                logger.info("Multi-language solution generated successfully")
+            return result
+        
+        # Use traditional domain-specific approach with SAFE prompting
+        logger.info("Using safe domain solution for %s", domain)
+        result = self._create_safe_domain_solution(domain, system_prompt, prompt, task_text)
+        if result['success']:
+            result['approach_used'] = 'specialized'
+            result['domain'] = domain
+            if language_info:
+                result['language'] = language_info.get('language', 'python')
+        return result
+    
+    def _create_safe_domain_prompt(self, task: Dict[str, Any], domain: str, context: str) -> Tuple[str, str, str]:
+        """Create SAFE, domain-specific (system, task fields, user) prompts."""
+        
+        system_prompt, default_deliverable = _SAFE_PROMPTS.get(domain, _SAFE_PROMPTS['code'])  # Default to code
+        fields = self._prompt_fields(task, context, default_deliverable)
+        return system_prompt, _TASK_HEADER.format_map(fields), _TASK_PROMPT.format_map(fields)
+    
+    def _create_safe_domain_solution(self, domain: str, system_prompt: str, prompt: str, task_text: Optional[str] = None) -> Dict[str, Any]:
+        """Create domain-specific solution with safety guardrails."""
+        
+        try:
+            marker = _STREAM_MARKERS.get(domain, "CODE:")  # other domains use the code prompt
+            extractor = self._streaming_extractor(marker) if marker else None
+            return self._cached_chat(prompt, domain, extractor, system_prompt=system_prompt, task_text=task_text)
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Error generating {domain} solution: {str(e)}'
+            }
+    
+    def _streaming_extractor(self, section_marker: str) -> StreamingExtractor:
+        """Extractor for a streamed response, ignoring any reasoning before the final answer."""
+        
+        start_marker = None
+        if self.llm_client.extract_final_answer:
+            start_marker = self.llm_client.final_answer_marker
+        return StreamingExtractor(section_marker, start_marker=start_marker)
+    
+    def _cached_chat(self, prompt: str, domain: str, extractor: Optional[StreamingExtractor] = None, system_prompt: Optional[str] = None, task_text: Optional[str] = None) -> Dict[str, Any]:
+        """Return the extracted solution for a prompt, reusing earlier answers.
+        
+        Identical prompts are looked up by hash first. Otherwise, when the
+        prompt starts with task_text (the task's title, description and
+        deliverable), only that part is embedded and compared against earlier
+        tasks for the same model, domain, system prompt and remaining prompt
+        text (the project context); a match at SEMANTIC_CACHE_THRESHOLD or
+        above reuses that solution. Only successful extractions are cached, in
+        memory for RESPONSE_CACHE_TTL (exact) or SEMANTIC_CACHE_TTL (similar)
+        seconds; they are written to the persistent cache once report_execution
+        confirms the solution ran.
+        """
+        
+        now = time.monotonic()
+        key = hashlib.sha256(f"{self.model_name}\x00{domain}\x00{system_prompt}\x00{prompt}".encode()).hexdigest()
+        tag = None
+        if task_text is not None and prompt.startswith(task_text):
+            # Near-duplicate tasks only share a solution when their context is identical
+            context_hash = hashlib.blake2b(
+                f"{system_prompt}\x00{prompt[len(task_text):]}".encode(), digest_size=16
+            ).hexdigest()
+            tag = (self.model_name, domain, context_hash)
+        
+        with self._cache_lock:
+            hit = self._response_cache.get(key)
+            if hit is not None:
+                if now - hit[0] < RESPONSE_CACHE_TTL:
+                    self._response_cache.move_to_end(key)
+                else:
+                    del self._response_cache[key]
+                    hit = None
+        if hit is not None:
+            logger.debug("Exact response cache hit for %s", domain)
+            return self._serve(hit[2], key, prompt, domain, tag)
+        
+        stored = self._load_stored_response(key)
+        if stored is not None:
+            logger.debug("Persistent response cache hit for %s", domain)
+            with self._cache_lock:
+                self._remember(self._response_cache, key, (now, domain, stored), RESPONSE_CACHE_TTL)
+            return self._serve(stored, key, prompt, domain, tag)
+        
+        embedding = self._embed_prompt(task_text) if tag is not None else None
+        if embedding is not None:
+            norm = math.sqrt(sum(x * x for x in embedding))
+            best, best_key, best_score = None, None, SEMANTIC_CACHE_THRESHOLD
+            with self._cache_lock:
+                for cached_key, (cached_at, cached_tag, cached_embedding, cached_norm, cached_result) in self._semantic_cache.items():
+                    if cached_tag != tag or now - cached_at >= SEMANTIC_CACHE_TTL:
+                        continue
+                    if not norm or not cached_norm or len(cached_embedding) != len(embedding):
+                        continue
+                    score = sum(a * b for a, b in zip(embedding, cached_embedding)) / (norm * cached_norm)
+                    if score >= best_score:
+                        best, best_key, best_score = cached_result, cached_key, score
+                if best_key is not None:
+                    self._semantic_cache.move_to_end(best_key)
+            if best is not None:
+                logger.debug("Semantic response cache hit for %s (similarity %.3f)", domain, best_score)
+                # No key: this prompt didn't produce the solution, so it is never persisted under it
+                return self._serve(best, None, prompt, domain, tag)
+        
+        content = self._invoke_llm(prompt, extractor, system_prompt)
+        result = self._extract_solution(content)
+        
+        if not result.get('success'):
+            return dict(result)
+        with self._cache_lock:
+            self._remember(self._response_cache, key, (now, domain, result), RESPONSE_CACHE_TTL)
+            if embedding is not None:
+                self._remember(self._semantic_cache, key, (now, tag, embedding, norm, result), SEMANTIC_CACHE_TTL)
+        return self._serve(result, key, prompt, domain, tag)
+    
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, entry: tuple, ttl: float):
+        """Insert entry (whose first field is its time) into a cache, dropping expired
+        and least recently used entries. Caller holds _cache_lock."""
+        
+        now = entry[0]
+        for stale in [cached for cached, (cached_at, *_) in cache.items() if now - cached_at >= ttl]:
+            del cache[stale]
+        cache[key] = entry
+        cache.move_to_end(key)
+        while len(cache) > RESPONSE_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _serve(self, result: Dict[str, Any], key: Optional[str], prompt: str, domain: str, tag: Optional[tuple]) -> Dict[str, Any]:
+        """Return a copy of a cached result, remembered until its execution is reported."""
+        
+        with self._cache_lock:
+            self._unconfirmed[result['solution']] = (key, prompt, domain, tag, result)
+            self._unconfirmed.move_to_end(result['solution'])
+            while len(self._unconfirmed) > _MAX_UNCONFIRMED:
+                self._unconfirmed.popitem(last=False)
+        return dict(result)
+    
+    def report_execution(self, solution: str, success: bool):
+        """Record whether a solution returned by create_solution ran successfully.
+        
+        Successful solutions are written to the persistent cache. Failed ones
+        are dropped from every cache tier, so a retry asks the LLM again
+        instead of replaying the same broken answer. Solutions that didn't
+        come from the response cache (templates, multi-language) are ignored.
+        """
+        
+        with self._cache_lock:
+            entry = self._unconfirmed.pop(solution, None)
+        if entry is None:
+            return
+        key, prompt, domain, tag, result = entry
+        
+        if success:
+            if key is not None:
+                self._store_response(key, prompt, domain, result)
+            return
+        
+        logger.debug("Dropping cached %s solution that failed to run", domain)
+        with self._cache_lock:
+            if key is not None:
+                self._response_cache.pop(key, None)
+                if self._response_db is not None:
+                    self._response_db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            for stale in [cached for cached, entry in self._semantic_cache.items() if entry[4] is result]:
+                del self._semantic_cache[stale]
+    
+    def clear_response_cache(self, domain: Optional[str] = None):
+        """Drop cached solutions, for one domain or all of them (memory and disk)."""
+        
+        with self._cache_lock:
+            if domain is None:
+                self._response_cache.clear()
+                self._semantic_cache.clear()
+            else:
+                self._response_cache = OrderedDict(
+                    (key, entry) for key, entry in self._response_cache.items() if entry[1] != domain
+                )
+                self._semantic_cache = OrderedDict(
+                    (key, entry) for key, entry in self._semantic_cache.items() if entry[1][1] != domain
+                )
+            
+            if self._response_db is not None:
+                if domain is None:
+                    self._response_db.execute("DELETE FROM cache")
+                else:
+                    self._response_db.execute("DELETE FROM cache WHERE tag = ?", (domain,))
+    
+    def _load_stored_response(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._response_db is None:
+            return None
+        
+        oldest = int(time.time()) - RESPONSE_CACHE_MAX_AGE_DAYS * 86400
+        rows = self._response_db.execute(
+            "SELECT response FROM cache WHERE key = ? AND created_at > ?", (key, oldest)
+        )
+        return json.loads(rows[0][0]) if rows else None
+    
+    def _store_response(self, key: str, prompt: str, domain: str, result: Dict[str, Any]):
+        if self._response_db is None:
+            return
+        
+        self._response_db.execute(
+            "INSERT OR REPLACE INTO cache (key, prompt, response, created_at, tag) VALUES (?, ?, ?, ?, ?)",
+            (key, prompt, json.dumps(result), int(time.time()), domain)
+        )
+    
+    def _embed_prompt(self, prompt: str) -> Optional[List[float]]:
+        """Embed a prompt for the semantic cache, or None if unavailable."""
+        
+        if not self._semantic_cache_enabled:
+            return None
+        try:
+            return self.llm_client.embed(prompt, EMBEDDING_MODEL)
+        except Exception as e:
+            # Server without the embedding model: keep the exact-match tier only
+            logger.warning("Embedding failed, disabling semantic response cache: %s", e)
+            self._semantic_cache_enabled = False
+            return None
+    
+    def _invoke_llm(self, prompt: str, extractor: Optional[StreamingExtractor] = None, system_prompt: Optional[str] = None) -> str:
+        """Send a single-turn prompt to the LLM and return the response content.
+        
+        This is the only network call made by this class and accounts for
+        virtually all of its latency (seconds per call versus microseconds for
+        prompt building and extraction). When an extractor is given the
+        response is streamed and cut off once the solution block is complete.
+        
+        Concurrent calls with an identical prompt wait for the request that is
+        already in flight instead of sending a duplicate.
+        """
+        key = hashlib.blake2b(f"{system_prompt}\x00{prompt}".encode(), digest_size=16).hexdigest()
+        
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = Future()
+                self._inflight[key] = pending
+        
+        if not is_owner:
+            return pending.result()
+        
+        try:
+            content = self._request_llm(prompt, extractor, system_prompt)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(content)
+            return content
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
+    def _request_llm(self, prompt: str, extractor: Optional[StreamingExtractor] = None, system_prompt: Optional[str] = None) -> str:
+        """Perform the actual LLM request for _invoke_llm."""
+        
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            # Static instructions first so consecutive calls share a cacheable prefix
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        with self._request_slots:
+            if extractor is not None:
+                response = self.llm_client.chat_until(messages, extractor.feed, **get_generation_options())
+            else:
+                response = self.llm_client.chat(messages=messages, **get_generation_options())
+        return response['message']['content']
+    
+    def _prompt_fields(self, task: Dict[str, Any], context: str, default_deliverable: str) -> Dict[str, str]:
+        """Collect the per-task values substituted into the prompt templates."""
+        
+        return {
+            'title': task['title'],
+            'description': task['description'],
+            'deliverable': task['subtask_data'].get('deliverable', default_deliverable),
+            'context': context
+        }
+    
+    def _extract_solution(self, content: str) -> Dict[str, Any]:
+        """Extract solution from LLM response."""
+        
+        # Fast path for the layout the prompts ask for: EXPLANATION: ... CODE:\n```lang\n...```
+        head, marker, rest = content.partition("CODE:\n```")
+        if marker:
+            _, has_explanation, explanation = head.partition("EXPLANATION:")
+            _, newline, body = rest.partition("\n")
+            body, closed, _ = body.partition("```")
+            solution = body.strip()
+            # Anything unusual (another marker first, unclosed fence) goes to the full parser
+            if has_explanation and newline and closed and solution and not any(m in explanation for m in _SECTION_MARKERS):
+                return {
+                    'success': True,
+                    'solution': solution,
+                    'explanation': explanation.strip()
+                }
+        
+        explanation = ""
+        solution_section = content
+        
+        section_match = _SECTION_RE.search(content)
+        if section_match:
+            explanation = section_match.group('explanation').strip()
+            solution_section = (section_match.group('section') or "").strip()
+        
+        # Extract from markdown blocks
+        fence_match = _FENCE_RE.search(solution_section)
+        if fence_match:
+            solution = fence_match.group('body').strip()
+        else:
+            solution = solution_section.strip()
+        
+        if not solution:
+            return {
+                'success': False,
+                'error': 'No solution content generated'
+            }
+        
+        return {
+            'success': True,
+            'solution': solution,
+            'explanation': explanation
+        }
+    
+    def _create_generic_solution(self, task: Dict[str, Any], context: str, reason: str = None) -> Dict[str, Any]:
+        """Create solution using generic, ultra-safe approach."""
+        
+        fields = self._prompt_fields(task, context, 'Working solution')
+        generic_prompt = _TASK_PROMPT.format_map(fields)
+        if reason:
+            generic_prompt += f"\n\nFALLBACK REASON: {reason}"
 
-            content = response['message']['content']
-            return self._extract_solution(content)
+        try:
+            return self._cached_chat(generic_prompt, 'generic', self._streaming_extractor("SOLUTION:"), system_prompt=_GENERIC_SYSTEM,
+                                     task_text=_TASK_HEADER.format_map(fields))
             
         except Exception as e:
             return {
                 'success': False,
                 'error': f'Generic solution creation failed: {str(e)}'
-            }
\ No newline at end of file
+            }
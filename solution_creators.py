@@ -1,7 +1,7 @@
 from llm_client import LLMClient
 from config import get_llm_config
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 class BaseSolutionCreator(ABC):
     """Base class for domain-specific solution creators."""
@@ -412,13 +412,84 @@ Ensure the game demonstrates functionality and then exits for testing purposes."
     def get_execution_type(self) -> str:
         return "game_application"
 
+class StreamingExtractor:
+    """Watches a streamed LLM response for the end of its fenced solution block.
+    
+    Feed it chunks as they arrive; it reports completion once the opening and
+    closing ``` after the section marker have both been seen, so the caller can
+    stop the stream instead of waiting for trailing commentary. With a
+    start_marker (a reasoning model's final-answer marker), nothing before it
+    is considered, so a fenced block in the chain of thought can't end the
+    stream early.
+    """
+    
+    FENCE = "```"
+    
+    def __init__(self, section_marker: str = "SOLUTION:", start_marker: Optional[str] = None):
+        self.section_marker = section_marker
+        self.start_marker = start_marker
+        self.buffer = ""
+        self.fence_count = 0
+        self._started = not start_marker
+        self._section_found = False
+        self._scan_pos = 0
+    
+    def _find_marker(self, marker: str) -> bool:
+        """Move past marker if it has arrived; otherwise keep a tail that could start it."""
+        
+        marker_idx = self.buffer.find(marker, self._scan_pos)
+        if marker_idx == -1:
+            # Keep enough tail to catch a marker split across chunks
+            self._scan_pos = max(self._scan_pos, len(self.buffer) - len(marker) + 1)
+            return False
+        self._scan_pos = marker_idx + len(marker)
+        return True
+    
+    def feed(self, chunk: str) -> bool:
+        """Add a streamed chunk and return True once the solution block is complete."""
+        
+        self.buffer += chunk
+        
+        if not self._started:
+            if not self._find_marker(self.start_marker):
+                return False
+            self._started = True
+        
+        if not self._section_found:
+            if not self._find_marker(self.section_marker):
+                return False
+            self._section_found = True
+        
+        while self.fence_count < 2:
+            fence_idx = self.buffer.find(self.FENCE, self._scan_pos)
+            if fence_idx == -1:
+                self._scan_pos = max(self._scan_pos, len(self.buffer) - len(self.FENCE) + 1)
+                break
+            self.fence_count += 1
+            self._scan_pos = fence_idx + len(self.FENCE)
+        
+        return self.fence_count >= 2
+    
+    @property
+    def is_complete(self) -> bool:
+        return self.fence_count >= 2
+
 class SolutionCreatorFactory:
     """Factory for creating domain-specific solution creators."""
     
+    # Creators are stateless apart from their LLM client, so one instance per
+    # (domain, model) is shared instead of rebuilding a client on every call
+    _creator_cache: Dict[Tuple[str, Optional[str]], BaseSolutionCreator] = {}
+    
     @staticmethod
     def create_solution_creator(domain: str, model_name: str = "llama3.1:8b") -> BaseSolutionCreator:
         """Create appropriate solution creator based on domain."""
         
+        cache_key = (domain, model_name)
+        creator = SolutionCreatorFactory._creator_cache.get(cache_key)
+        if creator is not None:
+            return creator
+        
         creators = {
             'code': CodeSolutionCreator,
             'creative': CreativeSolutionCreator,
@@ -429,4 +500,6 @@ class SolutionCreatorFactory:
         }
         
         creator_class = creators.get(domain, CodeSolutionCreator)
-        return creator_class(model_name)
\ No newline at end of file
+        creator = creator_class(model_name)
+        SolutionCreatorFactory._creator_cache[cache_key] = creator
+        return creator
\ No newline at end of file
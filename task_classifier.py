@@ -1,49 +1,154 @@
+import functools
+import hashlib
 import json
-from typing import Dict, Any, List, Optional
+import logging
+import re
+import time
+from types import MappingProxyType
+from typing import Dict, Any, Optional
 from llm_client import LLMClient
-from config import get_llm_config
+from cache_db import open_cache_db
+from config import get_llm_config, RESPONSE_CACHE_DB, RESPONSE_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Keyword fallback: the first domain (in this order) sharing a whole word with the task.
+# Whole words keep e.g. 'ui' in "build" or 'data' in "database" from matching.
+_FALLBACK_KEYWORDS = (
+    ('creative', frozenset({'story', 'stories', 'write', 'writing', 'creative', 'poem', 'poems', 'poetry', 'novel'})),
+    ('data', frozenset({'data', 'dataset', 'analyze', 'analyse', 'analysis', 'chart', 'charts', 'csv', 'statistics'})),
+    ('game', frozenset({'game', 'games', 'player', 'level', 'levels', 'arcade', 'puzzle'})),
+    ('ui', frozenset({'interface', 'ui', 'design', 'button', 'buttons', 'form', 'forms'})),
+    ('research', frozenset({'research', 'investigate', 'report', 'study'})),
+)
+# Task text is lowercased before tokenizing, so the tables above are written in lowercase
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_JSON_DECODER = json.JSONDecoder()
+
+# Domains offered to the LLM, shared by every instance (read-only)
+_DOMAIN_DEFINITIONS = MappingProxyType({
+    'code': MappingProxyType({
+        'description': 'Software development, programming, building applications, scripts, APIs, algorithms, or any technical implementation',
+        'examples': ('Create a calculator', 'Build a web API', 'Implement sorting algorithm', 'Debug Python code')
+    }),
+    'creative': MappingProxyType({
+        'description': 'Creative writing, storytelling, content creation, poetry, scripts, or artistic expression',
+        'examples': ('Write a short story', 'Create a poem about nature', 'Draft a screenplay', 'Compose song lyrics')
+    }),
+    'data': MappingProxyType({
+        'description': 'Data analysis, statistics, visualization, machine learning, or processing datasets',
+        'examples': ('Analyze sales trends', 'Create data visualization', 'Process CSV files', 'Build ML model')
+    }),
+    'ui': MappingProxyType({
+        'description': 'User interface design, user experience, creating visual interfaces, or improving usability',
+        'examples': ('Design a login form', 'Create mobile app interface', 'Improve website UX', 'Build GUI application')
+    }),
+    'research': MappingProxyType({
+        'description': 'Information gathering, analysis, documentation, reports, or investigative work',
+        'examples': ('Research market trends', 'Write technical documentation', 'Analyze competitors', 'Create project report')
+    }),
+    'game': MappingProxyType({
+        'description': 'Game development, interactive entertainment, game mechanics, or gaming-related content',
+        'examples': ('Create a puzzle game', 'Build physics engine', 'Design game characters', 'Implement collision detection')
+    })
+})
+
+# "AVAILABLE DOMAINS" block of the classification prompts; the same for every task
+_DOMAINS_TEXT = "\n".join(
+    f"- **{domain}**: {info['description']}\n  Examples: " + ", ".join(f'"{ex}"' for ex in info['examples'][:2])
+    for domain, info in _DOMAIN_DEFINITIONS.items()
+)
+
+# Static per-domain metadata; get_domain_info returns mutable copies of it
+_DOMAIN_INFO = MappingProxyType({
+    'code': MappingProxyType({
+        'description': 'Software development and programming tasks',
+        'execution_type': 'subprocess',
+        'validation_focus': ('syntax', 'runtime_errors', 'best_practices'),
+        'file_extensions': ('.py', '.js', '.html', '.css', '.sql')
+    }),
+    'creative': MappingProxyType({
+        'description': 'Creative writing and content generation',
+        'execution_type': 'text_processing',
+        'validation_focus': ('coherence', 'style', 'word_count', 'flow'),
+        'file_extensions': ('.txt', '.md', '.doc')
+    }),
+    'data': MappingProxyType({
+        'description': 'Data analysis and visualization tasks',
+        'execution_type': 'data_processing',
+        'validation_focus': ('data_quality', 'statistical_validity', 'visualization'),
+        'file_extensions': ('.py', '.ipynb', '.csv', '.json')
+    }),
+    'ui': MappingProxyType({
+        'description': 'User interface and user experience design',
+        'execution_type': 'gui_application',
+        'validation_focus': ('usability', 'responsiveness', 'accessibility'),
+        'file_extensions': ('.py', '.html', '.css', '.js')
+    }),
+    'research': MappingProxyType({
+        'description': 'Information gathering and analysis tasks',
+        'execution_type': 'document_generation',
+        'validation_focus': ('accuracy', 'completeness', 'citations'),
+        'file_extensions': ('.md', '.txt', '.pdf', '.doc')
+    }),
+    'game': MappingProxyType({
+        'description': 'Game development and interactive entertainment',
+        'execution_type': 'game_application',
+        'validation_focus': ('gameplay', 'performance', 'graphics'),
+        'file_extensions': ('.py', '.js', '.cpp', '.cs')
+    })
+})
+
+# Canonical vocabulary strings. Validated results (which the classification cache
+# keeps around) reuse these objects rather than holding the strings decoded from JSON.
+_DOMAIN_NAMES = {domain: domain for domain in _DOMAIN_DEFINITIONS}
+_APPROACHES = {approach: approach for approach in ('specialized', 'specialized_cautious', 'hybrid', 'generic_fallback')}
+
+
+def _match_fallback_domain(text: str) -> Optional[str]:
+    """First fallback domain sharing a whole word with lowercase text, if any."""
+    words = frozenset(_WORD_RE.findall(text))
+    for domain, keywords in _FALLBACK_KEYWORDS:
+        if words & keywords:
+            return domain
+    return None
+
+
+def _canonical(vocabulary: Dict[str, str], value: Any) -> Optional[str]:
+    """Return the canonical copy of value, or None if it isn't in vocabulary."""
+    return vocabulary.get(value) if isinstance(value, str) else None
+
+# Table for LLM classifications in RESPONSE_CACHE_DB
+_CLASSIFICATION_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS classification_cache (
+        key TEXT PRIMARY KEY,
+        classification TEXT,
+        created_at INTEGER
+    )
+"""
 
 class TaskClassifier:
     """LLM-powered task classifier that understands context and intent."""
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, llm_client: Optional[LLMClient] = None):
         # Get LLM configuration
         llm_config = get_llm_config()
         self.model_name = model_name or llm_config["model"]
 
         # Initialize LLM client
-        self.llm_client = LLMClient(
-            provider=llm_config["provider"],
-            model=self.model_name,
-            api_key=llm_config.get("api_key"),
-            base_url=llm_config.get("base_url")
-        )
-        self.domain_definitions = {
-            'code': {
-                'description': 'Software development, programming, building applications, scripts, APIs, algorithms, or any technical implementation',
-                'examples': ['Create a calculator', 'Build a web API', 'Implement sorting algorithm', 'Debug Python code']
-            },
-            'creative': {
-                'description': 'Creative writing, storytelling, content creation, poetry, scripts, or artistic expression',
-                'examples': ['Write a short story', 'Create a poem about nature', 'Draft a screenplay', 'Compose song lyrics']
-            },
-            'data': {
-                'description': 'Data analysis, statistics, visualization, machine learning, or processing datasets',
-                'examples': ['Analyze sales trends', 'Create data visualization', 'Process CSV files', 'Build ML model']
-            },
-            'ui': {
-                'description': 'User interface design, user experience, creating visual interfaces, or improving usability',
-                'examples': ['Design a login form', 'Create mobile app interface', 'Improve website UX', 'Build GUI application']
-            },
-            'research': {
-                'description': 'Information gathering, analysis, documentation, reports, or investigative work',
-                'examples': ['Research market trends', 'Write technical documentation', 'Analyze competitors', 'Create project report']
-            },
-            'game': {
-                'description': 'Game development, interactive entertainment, game mechanics, or gaming-related content',
-                'examples': ['Create a puzzle game', 'Build physics engine', 'Design game characters', 'Implement collision detection']
-            }
-        }
+        if llm_client is not None:
+            self.llm_client = llm_client.with_options(model=self.model_name)
+        else:
+            self.llm_client = LLMClient(
+                provider=llm_config["provider"],
+                model=self.model_name,
+                api_key=llm_config.get("api_key"),
+                base_url=llm_config.get("base_url")
+            )
+        self._classify_cached = functools.lru_cache(maxsize=1024)(self._classify_with_llm)
+        # Classifications also persist next to the solution cache so restarts skip the LLM
+        self._cache_db = open_cache_db(RESPONSE_CACHE_DB, _CLASSIFICATION_CACHE_DDL, "classification cache")
+        self.domain_definitions = _DOMAIN_DEFINITIONS
     
     def classify_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Classify task using LLM understanding of context and intent."""
@@ -53,35 +158,62 @@ class TaskClassifier:
         description = task.get('description', '')
         deliverable = task.get('subtask_data', {}).get('deliverable', '')
         
-        # Create classification prompt
-        prompt = self._create_classification_prompt(title, description, deliverable)
-        
         try:
-            response = self.llm_client.chat(
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = response['message']['content']
-            classification_result = self._parse_classification_response(content)
-            
-            # Validate and enhance the result
-            return self._validate_and_enhance_classification(classification_result, task)
+            # Retries and re-runs classify identical tasks; only successful LLM answers are cached
+            classification = self._classify_cached(title, description, deliverable)
+            return dict(classification, key_indicators=list(classification['key_indicators']))
             
         except Exception as e:
-            print(f"[CLASSIFIER] LLM classification failed: {e}")
+            logger.warning("LLM classification failed: %s", e)
             # Fallback to simple heuristic
             return self._fallback_classification(title, description, deliverable)
     
-    def _create_classification_prompt(self, title: str, description: str, deliverable: str) -> str:
-        """Create a comprehensive classification prompt for the LLM."""
+    def _classify_with_llm(self, title: str, description: str, deliverable: str) -> Dict[str, Any]:
+        """Classify the task fields with one LLM call; raises if the call or parse fails."""
+        
+        key = hashlib.blake2b(f"{self.model_name}\x00{title}\x00{description}\x00{deliverable}".encode(),
+                              digest_size=16).hexdigest()
+        stored = self._load_stored_classification(key)
+        if stored is not None:
+            logger.debug("Persistent classification cache hit for %r", title)
+            return stored
+        
+        # Create classification prompt
+        prompt = self._create_classification_prompt(title, description, deliverable)
         
-        # Build domain descriptions
-        domain_descriptions = []
-        for domain, info in self.domain_definitions.items():
-            examples_str = ", ".join(f'"{ex}"' for ex in info['examples'][:2])
-            domain_descriptions.append(f"- **{domain}**: {info['description']}\n  Examples: {examples_str}")
+        response = self.llm_client.chat(
+            messages=[{"role": "user", "content": prompt}]
+        )
         
-        domains_text = "\n".join(domain_descriptions)
+        content = response['message']['content']
+        classification_result = self._parse_classification_response(content)
+        
+        # Validate and enhance the result
+        classification = self._validate_and_enhance_classification(classification_result)
+        self._store_classification(key, classification)
+        return classification
+    
+    def _load_stored_classification(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._cache_db is None:
+            return None
+        
+        oldest = int(time.time()) - RESPONSE_CACHE_MAX_AGE_DAYS * 86400
+        rows = self._cache_db.execute(
+            "SELECT classification FROM classification_cache WHERE key = ? AND created_at > ?", (key, oldest)
+        )
+        return json.loads(rows[0][0]) if rows else None
+    
+    def _store_classification(self, key: str, classification: Dict[str, Any]):
+        if self._cache_db is None:
+            return
+        
+        self._cache_db.execute(
+            "INSERT OR REPLACE INTO classification_cache (key, classification, created_at) VALUES (?, ?, ?)",
+            (key, json.dumps(classification), int(time.time()))
+        )
+    
+    def _create_classification_prompt(self, title: str, description: str, deliverable: str) -> str:
+        """Create a comprehensive classification prompt for the LLM."""
         
         prompt = f"""You are an expert task classifier. Analyze the following task and classify it into the most appropriate domain.
 
@@ -91,7 +223,7 @@ Description: "{description}"
 Expected Deliverable: "{deliverable}"
 
 AVAILABLE DOMAINS:
-{domains_text}
+{_DOMAINS_TEXT}
 
 CLASSIFICATION INSTRUCTIONS:
 1. Read the task carefully and understand the core intent
@@ -126,43 +258,45 @@ Focus on the ACTUAL WORK being requested, not just keywords."""
         """Parse the LLM's classification response."""
         
         try:
-            # Find JSON in the response
+            # Decode the first complete JSON object in place; raw_decode stops at its
+            # closing brace, so trailing text (even with braces) doesn't matter
             start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
+            while start_idx != -1:
+                try:
+                    result, _ = _JSON_DECODER.raw_decode(content, start_idx)
+                    return result
+                except json.JSONDecodeError:
+                    start_idx = content.find('{', start_idx + 1)
             
-            if start_idx != -1 and end_idx != -1:
-                json_content = content[start_idx:end_idx]
-                result = json.loads(json_content)
-                return result
-            else:
-                raise ValueError("No valid JSON found in response")
+            raise ValueError("No valid JSON found in response")
                 
         except (json.JSONDecodeError, ValueError) as e:
-            print(f"[CLASSIFIER] Failed to parse LLM response: {e}")
-            print(f"[CLASSIFIER] Raw response: {content[:200]}...")
+            logger.warning("Failed to parse LLM response: %s", e)
+            logger.debug("Raw response: %.200s...", content)
             raise
     
-    def _validate_and_enhance_classification(self, result: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_and_enhance_classification(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and enhance the classification result."""
         
         # Ensure required fields exist
-        primary_domain = result.get('primary_domain', 'code')
+        primary_domain = _canonical(_DOMAIN_NAMES, result.get('primary_domain', 'code'))
         confidence = float(result.get('confidence', 0.5))
+        is_hybrid = result.get('is_hybrid', False)
         
         # Validate domain exists
-        if primary_domain not in self.domain_definitions:
-            print(f"[CLASSIFIER] Invalid domain '{primary_domain}', defaulting to 'code'")
+        if primary_domain is None:
+            logger.warning("Invalid domain '%s', defaulting to 'code'", result.get('primary_domain'))
             primary_domain = 'code'
             confidence = 0.3
         
         # Determine approach if not provided or invalid
-        approach = result.get('approach')
-        if not approach or approach not in ['specialized', 'specialized_cautious', 'hybrid', 'generic_fallback']:
+        approach = _canonical(_APPROACHES, result.get('approach'))
+        if approach is None:
             if confidence > 0.8:
                 approach = 'specialized'
             elif confidence > 0.5:
                 approach = 'specialized_cautious'
-            elif result.get('is_hybrid', False):
+            elif is_hybrid:
                 approach = 'hybrid'
             else:
                 approach = 'generic_fallback'
@@ -170,20 +304,20 @@ Focus on the ACTUAL WORK being requested, not just keywords."""
         # Build enhanced result
         enhanced_result = {
             'primary_domain': primary_domain,
-            'secondary_domain': result.get('secondary_domain'),
+            'secondary_domain': _canonical(_DOMAIN_NAMES, result.get('secondary_domain')) or result.get('secondary_domain'),
             'confidence': confidence,
             'reasoning': result.get('reasoning', 'LLM-based classification'),
-            'is_hybrid': result.get('is_hybrid', False),
+            'is_hybrid': is_hybrid,
             'approach': approach,
             'key_indicators': result.get('key_indicators', []),
             'is_confident': confidence > 0.5,
-            'fallback_reason': self._get_fallback_reason(confidence, result.get('is_hybrid', False), approach),
+            'fallback_reason': self._get_fallback_reason(confidence, approach),
             'classification_method': 'llm_powered'
         }
         
         return enhanced_result
     
-    def _get_fallback_reason(self, confidence: float, is_hybrid: bool, approach: str) -> Optional[str]:
+    def _get_fallback_reason(self, confidence: float, approach: str) -> Optional[str]:
         """Generate fallback reason based on classification results."""
         
         if approach == 'generic_fallback':
@@ -198,25 +332,14 @@ Focus on the ACTUAL WORK being requested, not just keywords."""
     def _fallback_classification(self, title: str, description: str, deliverable: str) -> Dict[str, Any]:
         """Simple fallback classification when LLM fails."""
         
-        combined_text = f"{title} {description} {deliverable}".lower()
+        # Simple keyword-based fallback. The title usually names the kind of work
+        # ("Write a short story ..."), so only tokenize the rest when it doesn't match.
+        primary_domain = _match_fallback_domain(title.lower())
+        if primary_domain is None:
+            primary_domain = _match_fallback_domain(f"{description} {deliverable}".lower())
         
-        # Simple keyword-based fallback
-        if any(word in combined_text for word in ['story', 'write', 'creative', 'poem', 'novel']):
-            primary_domain = 'creative'
-            confidence = 0.6
-        elif any(word in combined_text for word in ['data', 'analyze', 'chart', 'csv', 'statistics']):
-            primary_domain = 'data'
-            confidence = 0.6
-        elif any(word in combined_text for word in ['game', 'player', 'level', 'arcade', 'puzzle']):
-            primary_domain = 'game'
-            confidence = 0.6
-        elif any(word in combined_text for word in ['interface', 'ui', 'design', 'button', 'form']):
-            primary_domain = 'ui'
-            confidence = 0.6
-        elif any(word in combined_text for word in ['research', 'investigate', 'report', 'study']):
-            primary_domain = 'research'
-            confidence = 0.6
-        else:
+        confidence = 0.6
+        if primary_domain is None:
             primary_domain = 'code'
             confidence = 0.5
         
@@ -236,46 +359,10 @@ Focus on the ACTUAL WORK being requested, not just keywords."""
     def get_domain_info(self, domain: str) -> Dict[str, Any]:
         """Get information about a specific domain."""
         
-        domain_info = {
-            'code': {
-                'description': 'Software development and programming tasks',
-                'execution_type': 'subprocess',
-                'validation_focus': ['syntax', 'runtime_errors', 'best_practices'],
-                'file_extensions': ['.py', '.js', '.html', '.css', '.sql']
-            },
-            'creative': {
-                'description': 'Creative writing and content generation',
-                'execution_type': 'text_processing',
-                'validation_focus': ['coherence', 'style', 'word_count', 'flow'],
-                'file_extensions': ['.txt', '.md', '.doc']
-            },
-            'data': {
-                'description': 'Data analysis and visualization tasks',
-                'execution_type': 'data_processing',
-                'validation_focus': ['data_quality', 'statistical_validity', 'visualization'],
-                'file_extensions': ['.py', '.ipynb', '.csv', '.json']
-            },
-            'ui': {
-                'description': 'User interface and user experience design',
-                'execution_type': 'gui_application',
-                'validation_focus': ['usability', 'responsiveness', 'accessibility'],
-                'file_extensions': ['.py', '.html', '.css', '.js']
-            },
-            'research': {
-                'description': 'Information gathering and analysis tasks',
-                'execution_type': 'document_generation',
-                'validation_focus': ['accuracy', 'completeness', 'citations'],
-                'file_extensions': ['.md', '.txt', '.pdf', '.doc']
-            },
-            'game': {
-                'description': 'Game development and interactive entertainment',
-                'execution_type': 'game_application',
-                'validation_focus': ['gameplay', 'performance', 'graphics'],
-                'file_extensions': ['.py', '.js', '.cpp', '.cs']
-            }
-        }
-        
-        return domain_info.get(domain, domain_info['code'])
+        # A fresh plain dict per call: callers may modify it without touching the shared table
+        info = _DOMAIN_INFO.get(domain, _DOMAIN_INFO['code'])
+        return {key: list(value) if isinstance(value, tuple) else value
+                for key, value in info.items()}
     
     def explain_classification(self, classification: Dict[str, Any]) -> str:
         """Generate human-readable explanation of the classification."""
@@ -1,9 +1,31 @@
+import atexit
 import sqlite3
 import json
+import queue
+import secrets
+import threading
 import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON columns (subtask_data, metadata, result). orjson is optional: it serializes several
+# times faster. Its output is decoded so the columns hold TEXT, not BLOB.
+if orjson is not None:
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -11,96 +33,267 @@ class TaskStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Per-connection settings applied on every open. synchronous=NORMAL is safe under
+# WAL: a commit is a WAL append and only checkpoints fsync.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256 MiB
+    "PRAGMA cache_size=-65536",     # 64 MiB
+    "PRAGMA busy_timeout=5000",     # ms to wait for another writer instead of failing
+)
+
+# Tables and indexes. get_next_task/claim_next_task walk idx_tasks_status_priority
+# in order and stop at its first row; completed tasks of a parent come off
+# idx_tasks_status_parent already sorted. The leading status column also serves
+# get_task_count_by_status's GROUP BY.
+_SCHEMA_SQL = """
+    BEGIN;
+    
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        parent_id TEXT,
+        title TEXT NOT NULL,
+        description TEXT,
+        subtask_data TEXT,
+        status TEXT NOT NULL,
+        priority INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        result TEXT,
+        error_message TEXT
+    );
+    
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_priority
+    ON tasks (status, priority DESC, created_at ASC);
+    
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_parent
+    ON tasks (status, parent_id, updated_at);
+    
+    CREATE TABLE IF NOT EXISTS project_state (
+        id TEXT PRIMARY KEY,
+        project_name TEXT NOT NULL,
+        objective TEXT NOT NULL,
+        current_phase TEXT,
+        metadata TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    COMMIT;
+"""
+
+# Shared by the single and batch inserts so they hit the same cached prepared statements
+_INSERT_PROJECT_SQL = """
+    INSERT INTO project_state (id, project_name, objective, current_phase, metadata)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_TASK_SQL = """
+    INSERT INTO tasks (id, parent_id, title, description, subtask_data, status, priority)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _new_task_id() -> str:
+    """Random 128-bit task ID; hex without uuid4's object and dashed formatting.
+    
+    IDs stay TEXT so existing databases and their uuid4 IDs keep working.
+    """
+    return secrets.token_hex(16)
+
 class TaskQueue:
-    def __init__(self, db_path: str = "tasks.db"):
+    def __init__(self, db_path: str = "tasks.db", reader_pool_size: int = 4):
         self.db_path = db_path
+        # SQLite allows one writer at a time: a single long-lived writer connection
+        # (so its statement cache is reused) owned by a writer thread, plus a pool of
+        # read-only connections that read the WAL snapshot in parallel with it
+        self._writer_lock = threading.Lock()
+        self._writer = self._connect()
+        self._status_counts = None  # (database version, counts) for get_task_count_by_status
         self.init_db()
+        
+        self._readers = queue.Queue(maxsize=reader_pool_size)
+        for _ in range(reader_pool_size):
+            self._readers.put(self._connect(read_only=True))
+        
+        # Producers hand writes to the writer thread, which commits everything that
+        # queued up meanwhile in one transaction instead of one commit per call
+        self._write_queue = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._drain_writes, daemon=True)
+        self._writer_thread.start()
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open an autocommit connection with the queue's PRAGMAs applied."""
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _read(self):
+        """Borrow a read-only connection from the pool."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def _write(self, sql: str, params=(), many: bool = False) -> List[tuple]:
+        """Run a statement (executemany if many) on the writer thread.
+        
+        Returns once committed, with any rows the statement returned (RETURNING).
+        """
+        return self._write_all([(sql, params, many)])[0]
+    
+    def _write_all(self, statements: List[Tuple[str, Any, bool]]) -> List[List[tuple]]:
+        """Run (sql, params, many) statements atomically on the writer thread.
+        
+        Returns once committed, with each statement's returned rows.
+        """
+        if not self._writer_thread.is_alive():
+            raise sqlite3.ProgrammingError("Cannot operate on a closed task queue.")
+        future = Future()
+        self._write_queue.put((future, statements))
+        return future.result()
+    
+    def _drain_writes(self):
+        while True:
+            writes = [self._write_queue.get()]
+            while True:
+                try:
+                    writes.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if None in writes:  # close() was called
+                stop = writes.index(None)
+                for future, *_ in writes[stop + 1:]:
+                    future.set_exception(sqlite3.ProgrammingError("Cannot operate on a closed task queue."))
+                if stop:
+                    self._commit_writes(writes[:stop])
+                return
+            
+            self._commit_writes(writes)
+    
+    def _commit_writes(self, writes):
+        """Apply queued writes in one transaction, each in a savepoint so a failing
+        write is rolled back on its own without losing the others."""
+        succeeded = []
+        with self._writer_lock:
+            try:
+                self._writer.execute("BEGIN IMMEDIATE")
+                for future, statements in writes:
+                    self._writer.execute("SAVEPOINT queued_write")
+                    try:
+                        results = [
+                            (self._writer.executemany if many else self._writer.execute)(sql, params).fetchall()
+                            for sql, params, many in statements
+                        ]
+                    except Exception as e:
+                        self._writer.execute("ROLLBACK TO queued_write")
+                        future.set_exception(e)
+                    else:
+                        succeeded.append((future, results))
+                    self._writer.execute("RELEASE queued_write")
+                self._writer.execute("COMMIT")
+            except Exception as e:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                for future, *_ in writes:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        
+        # Only report success once the writes are committed
+        for future, results in succeeded:
+            future.set_result(results)
     
     def init_db(self):
         """Initialize the SQLite database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tasks table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                parent_id TEXT,
-                title TEXT NOT NULL,
-                description TEXT,
-                subtask_data TEXT,
-                status TEXT NOT NULL,
-                priority INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                result TEXT,
-                error_message TEXT
-            )
-        """)
-        
-        # Project state table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS project_state (
-                id TEXT PRIMARY KEY,
-                project_name TEXT NOT NULL,
-                objective TEXT NOT NULL,
-                current_phase TEXT,
-                metadata TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        with self._writer_lock:
+            # WAL is persistent in the database file: readers no longer block on writers
+            self._writer.execute("PRAGMA journal_mode=WAL")
+        
+            # All tables and indexes in one script and one transaction
+            self._writer.executescript(_SCHEMA_SQL)
         
-        conn.commit()
-        conn.close()
+            # Refresh planner statistics if they are missing or stale (cheap otherwise)
+            self._writer.execute("PRAGMA optimize")
     
     def create_project(self, project_name: str, objective: str) -> str:
         """Create a new project and return its ID."""
         project_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._write(_INSERT_PROJECT_SQL, (project_id, project_name, objective, "planning", "{}"))
         
-        cursor.execute("""
-            INSERT INTO project_state (id, project_name, objective, current_phase, metadata)
-            VALUES (?, ?, ?, ?, ?)
-        """, (project_id, project_name, objective, "planning", "{}"))
-        
-        conn.commit()
-        conn.close()
         return project_id
     
+    def create_project_with_tasks(self, project_name: str, objective: str,
+                                  tasks: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+        """Create a project and its initial tasks in one transaction.
+        
+        tasks take the same dicts as add_tasks; each task's subtask_data gets the
+        new project's ID under 'project_id'. Returns (project_id, task_ids).
+        """
+        project_id = str(uuid.uuid4())
+        for task in tasks:
+            task['subtask_data']['project_id'] = project_id
+        task_ids, rows = self._task_rows(tasks)
+        
+        # One atomic write: the project never exists without its tasks
+        self._write_all([
+            (_INSERT_PROJECT_SQL, (project_id, project_name, objective, "planning", "{}"), False),
+            (_INSERT_TASK_SQL, rows, True),
+        ])
+        
+        return project_id, task_ids
+    
     def add_task(self, title: str, description: str, subtask_data: Dict[str, Any], 
                  parent_id: Optional[str] = None, priority: int = 0) -> str:
         """Add a new task to the queue."""
-        task_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO tasks (id, parent_id, title, description, subtask_data, status, priority)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (task_id, parent_id, title, description, json.dumps(subtask_data), 
-              TaskStatus.PENDING.value, priority))
-        
-        conn.commit()
-        conn.close()
+        task_id = _new_task_id()
+        self._write(_INSERT_TASK_SQL, (task_id, parent_id, title, description, _dumps(subtask_data),
+                                       TaskStatus.PENDING.value, priority))
+        
         return task_id
     
+    def add_tasks(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        """Add several tasks in one transaction and return their IDs in order.
+        
+        Each dict takes add_task's arguments: title, description, subtask_data,
+        and optionally parent_id and priority.
+        """
+        task_ids, rows = self._task_rows(tasks)
+        
+        # One statement (and savepoint) for the whole batch: all rows or none
+        self._write(_INSERT_TASK_SQL, rows, many=True)
+        
+        return task_ids
+    
+    def _task_rows(self, tasks: List[Dict[str, Any]]) -> Tuple[List[str], List[tuple]]:
+        """New IDs and _INSERT_TASK_SQL parameter rows for add_tasks-style dicts."""
+        task_ids = [_new_task_id() for _ in tasks]
+        rows = [
+            (task_id, task.get('parent_id'), task['title'], task['description'],
+             _dumps(task['subtask_data']), TaskStatus.PENDING.value, task.get('priority', 0))
+            for task_id, task in zip(task_ids, tasks)
+        ]
+        return task_ids, rows
+    
     def get_next_task(self) -> Optional[Dict[str, Any]]:
         """Get the next pending task with highest priority."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, parent_id, title, description, subtask_data, status, priority, created_at
-            FROM tasks
-            WHERE status = ?
-            ORDER BY priority DESC, created_at ASC
-            LIMIT 1
-        """, (TaskStatus.PENDING.value,))
+        with self._read() as conn:
+            cursor = conn.execute("""
+                SELECT id, parent_id, title, description, subtask_data, status, priority, created_at
+                FROM tasks
+                WHERE status = ?
+                ORDER BY priority DESC, created_at ASC
+                LIMIT 1
+            """, (TaskStatus.PENDING.value,))
         
-        row = cursor.fetchone()
-        conn.close()
+            row = cursor.fetchone()
         
         if row:
             return {
@@ -108,103 +301,166 @@ class TaskQueue:
                 'parent_id': row[1],
                 'title': row[2],
                 'description': row[3],
-                'subtask_data': json.loads(row[4]),
+                'subtask_data': _loads(row[4]),
                 'status': row[5],
                 'priority': row[6],
                 'created_at': row[7]
             }
         return None
     
-    def update_task_status(self, task_id: str, status: TaskStatus, 
-                          result: Optional[str] = None, error_message: Optional[str] = None):
-        """Update task status and result."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def claim_next_task(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the next pending task and mark it in progress.
         
-        cursor.execute("""
+        Unlike get_next_task followed by update_task_status, two workers can
+        never receive the same task.
+        """
+        rows = self._write("""
+            UPDATE tasks
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM tasks
+                WHERE status = ?
+                ORDER BY priority DESC, created_at ASC
+                LIMIT 1
+            )
+            RETURNING id, parent_id, title, description, subtask_data, status, priority, created_at
+        """, (TaskStatus.IN_PROGRESS.value, TaskStatus.PENDING.value))
+        
+        if rows:
+            row = rows[0]
+            return {
+                'id': row[0],
+                'parent_id': row[1],
+                'title': row[2],
+                'description': row[3],
+                'subtask_data': _loads(row[4]),
+                'status': row[5],
+                'priority': row[6],
+                'created_at': row[7]
+            }
+        return None
+    
+    def update_task_status(self, task_id: str, status: TaskStatus, 
+                          result: Optional[Any] = None, error_message: Optional[str] = None):
+        """Update task status and result (a JSON string, or a value to serialize as JSON)."""
+        if result is not None and not isinstance(result, str):
+            result = _dumps(result)
+        self._write("""
             UPDATE tasks 
             SET status = ?, result = ?, error_message = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         """, (status.value, result, error_message, task_id))
-        
-        conn.commit()
-        conn.close()
+    
+    @staticmethod
+    def load_result(result: Union[str, bytes]) -> Any:
+        """Parse a result column as stored by update_task_status."""
+        return _loads(result)
     
     def get_project_state(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get current project state."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._read() as conn:
+            cursor = conn.execute("""
+                SELECT project_name, objective, current_phase, metadata
+                FROM project_state WHERE id = ?
+            """, (project_id,))
         
-        cursor.execute("""
-            SELECT project_name, objective, current_phase, metadata
-            FROM project_state WHERE id = ?
-        """, (project_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
+            row = cursor.fetchone()
         
         if row:
             return {
                 'project_name': row[0],
                 'objective': row[1],
                 'current_phase': row[2],
-                'metadata': json.loads(row[3])
+                'metadata': _loads(row[3])
             }
         return None
     
     def update_project_phase(self, project_id: str, phase: str, metadata: Dict[str, Any] = None):
         """Update project phase and metadata."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if metadata is None:
             metadata = {}
         
-        cursor.execute("""
+        self._write("""
             UPDATE project_state 
             SET current_phase = ?, metadata = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
-        """, (phase, json.dumps(metadata), project_id))
-        
-        conn.commit()
-        conn.close()
+        """, (phase, _dumps(metadata), project_id))
     
     def get_completed_tasks(self, parent_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all completed tasks, optionally filtered by parent_id."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if parent_id:
-            cursor.execute("""
-                SELECT id, title, description, result, updated_at
-                FROM tasks
-                WHERE status = ? AND parent_id = ?
-                ORDER BY updated_at ASC
-            """, (TaskStatus.COMPLETED.value, parent_id))
-        else:
-            cursor.execute("""
-                SELECT id, title, description, result, updated_at
-                FROM tasks
-                WHERE status = ?
-                ORDER BY updated_at ASC
-            """, (TaskStatus.COMPLETED.value,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._read() as conn:
+            if parent_id:
+                rows = conn.execute("""
+                    SELECT id, title, description, CAST(result AS TEXT), updated_at
+                    FROM tasks
+                    WHERE status = ? AND parent_id = ?
+                    ORDER BY updated_at ASC
+                """, (TaskStatus.COMPLETED.value, parent_id)).fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT id, title, description, CAST(result AS TEXT), updated_at
+                    FROM tasks
+                    WHERE status = ?
+                    ORDER BY updated_at ASC
+                """, (TaskStatus.COMPLETED.value,)).fetchall()
         
-        return [{'id': row[0], 'title': row[1], 'description': row[2], 
-                'result': row[3], 'updated_at': row[4]} for row in rows]
+        return [{'id': row[0], 'title': row[1], 'description': row[2],
+                 'result': row[3], 'updated_at': row[4]} for row in rows]
     
     def get_task_count_by_status(self) -> Dict[str, int]:
         """Get count of tasks by status."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Managers poll this in their loops; only recount after the database changed.
+        # data_version moves when any other connection (or process) commits,
+        # total_changes when this queue's own writer does.
+        with self._writer_lock:
+            version = (self._writer.execute("PRAGMA data_version").fetchone()[0],
+                       self._writer.total_changes)
+        if self._status_counts is not None and self._status_counts[0] == version:
+            return dict(self._status_counts[1])
         
-        cursor.execute("""
-            SELECT status, COUNT(*) FROM tasks GROUP BY status
-        """)
+        with self._read() as conn:
+            cursor = conn.execute("""
+                SELECT status, COUNT(*) FROM tasks GROUP BY status
+            """)
         
-        rows = cursor.fetchall()
-        conn.close()
+            rows = cursor.fetchall()
         
-        return {row[0]: row[1] for row in rows}
\ No newline at end of file
+        counts = {row[0]: row[1] for row in rows}
+        self._status_counts = (version, counts)
+        return dict(counts)
+    
+    def close(self):
+        """Finish pending writes and close the queue's database connections."""
+        if self._writer_thread.is_alive():
+            self._write_queue.put(None)
+            self._writer_thread.join()
+        with self._writer_lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+# One TaskQueue per database file for the whole process. Each TaskQueue holds a
+# writer connection, a reader pool and a writer thread, so the agents share one
+# instead of opening their own.
+_shared_queues: Dict[str, TaskQueue] = {}
+_shared_queues_lock = threading.Lock()
+
+def shared_task_queue(db_path: str = "tasks.db") -> TaskQueue:
+    """Get the process-wide TaskQueue for db_path, opening it on first use.
+    
+    Shared queues are closed at interpreter exit, so pending writes are committed.
+    """
+    key = str(Path(db_path).resolve())
+    with _shared_queues_lock:
+        task_queue = _shared_queues.get(key)
+        if task_queue is None or not task_queue._writer_thread.is_alive():
+            task_queue = _shared_queues[key] = TaskQueue(db_path)
+        return task_queue
+
+@atexit.register
+def _close_shared_queues():
+    with _shared_queues_lock:
+        for task_queue in _shared_queues.values():
+            task_queue.close()
+        _shared_queues.clear()
@@ -3,15 +3,22 @@
 Test language detection for the Doom clone objective
 """
 
+import functools
+
+from language_classifier import LanguageClassifier
+
+@functools.lru_cache(maxsize=1)
+def _classifier():
+    """One LanguageClassifier (and LLM client) shared by all tests in this run."""
+    return LanguageClassifier()
+
 def test_doom_language_detection():
     """Test language detection for Doom clone."""
     
     print("🔍 TESTING: Language Detection for Doom Clone")
     print("="*60)
     
-    from language_classifier import LanguageClassifier
-    
-    classifier = LanguageClassifier()
+    classifier = _classifier()
     
     # Test the exact task
     doom_task = {
@@ -61,9 +68,7 @@ def test_various_js_phrases():
     print("\n🧪 TESTING: Various JavaScript Phrases")
     print("="*60)
     
-    from language_classifier import LanguageClassifier
-    
-    classifier = LanguageClassifier()
+    classifier = _classifier()
     
     test_phrases = [
         "Create a JavaScript game",
@@ -74,15 +79,18 @@ def test_various_js_phrases():
         "Create browser-based game in JavaScript"
     ]
     
-    js_detected = 0
-    
-    for phrase in test_phrases:
-        task = {
+    tasks = [
+        {
             'title': phrase,
             'description': f'Please {phrase.lower()}',
             'subtask_data': {'deliverable': 'Working application'}
         }
-        
+        for phrase in test_phrases
+    ]
+    
+    js_detected = 0
+    
+    for phrase, task in zip(test_phrases, tasks):
         result = classifier.classify_language(task)
         detected_js = result['language'] == 'javascript'
         
@@ -3,15 +3,22 @@
 Test the new LLM-based task classifier
 """
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+@functools.lru_cache(maxsize=1)
+def _classifier():
+    """One TaskClassifier (and LLM client) shared by all tests in this run."""
+    from task_classifier import TaskClassifier
+    return TaskClassifier()
+
 def test_llm_classification():
     """Test LLM-based classification with various task types."""
     
     print("🧪 TESTING: LLM-Based Task Classification")
     print("="*60)
     
-    from task_classifier import TaskClassifier
-    
-    classifier = TaskClassifier()
+    classifier = _classifier()
     
     test_cases = [
         {
@@ -46,12 +53,16 @@ def test_llm_classification():
         }
     ]
     
-    for i, task in enumerate(test_cases, 1):
+    # Send all classification requests at once; results are reported in order
+    with ThreadPoolExecutor(max_workers=len(test_cases)) as pool:
+        futures = [pool.submit(classifier.classify_task, task) for task in test_cases]
+    
+    for i, (task, future) in enumerate(zip(test_cases, futures), 1):
         print(f"\n{i}. Testing: {task['title']}")
         print("="*50)
         
         try:
-            classification = classifier.classify_task(task)
+            classification = future.result()
             
             print(f"📝 Task: {task['title']}")
             print(f"📄 Description: {task['description'][:80]}...")
@@ -80,9 +91,7 @@ def test_edge_cases():
     print("\n🧪 TESTING: Edge Cases and Ambiguous Tasks")
     print("="*60)
     
-    from task_classifier import TaskClassifier
-    
-    classifier = TaskClassifier()
+    classifier = _classifier()
     
     edge_cases = [
         {
@@ -102,11 +111,14 @@ def test_edge_cases():
         }
     ]
     
-    for i, task in enumerate(edge_cases, 1):
+    with ThreadPoolExecutor(max_workers=len(edge_cases)) as pool:
+        futures = [pool.submit(classifier.classify_task, task) for task in edge_cases]
+    
+    for i, (task, future) in enumerate(zip(edge_cases, futures), 1):
         print(f"\n{i}. Edge Case: {task['title']}")
         
         try:
-            classification = classifier.classify_task(task)
+            classification = future.result()
             print(classifier.explain_classification(classification))
             
             if classification.get('is_hybrid'):
@@ -136,9 +148,7 @@ def compare_classification_methods():
     
     # Test with LLM classifier
     try:
-        from task_classifier import TaskClassifier
-        
-        llm_classifier = TaskClassifier()
+        llm_classifier = _classifier()
         llm_result = llm_classifier.classify_task(task)
         
         print("🤖 LLM-Based Classification:")
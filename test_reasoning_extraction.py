@@ -3,7 +3,7 @@
 Test script to verify reasoning model final answer extraction.
 """
 
-from llm_client import LLMClient
+from llm_client import LLMClient, _END_MARKER_RE
 from config import get_llm_config
 
 def test_extraction():
@@ -51,17 +51,15 @@ Here is my final answer.<|end|>""",
             if not self.extract_final_answer or not self.final_answer_marker:
                 return content
 
-            if self.final_answer_marker in content:
-                marker_pos = content.find(self.final_answer_marker)
-                final_answer = content[marker_pos + len(self.final_answer_marker):].strip()
-
-                for end_marker in ["<|end|>", "<|endoftext|>", "<|eot_id|>"]:
-                    if end_marker in final_answer:
-                        final_answer = final_answer.split(end_marker)[0].strip()
+            _, marker, final_answer = content.partition(self.final_answer_marker)
+            if not marker:
+                return content
 
-                return final_answer
+            end = _END_MARKER_RE.search(final_answer)
+            if end:
+                final_answer = final_answer[:end.start()]
 
-            return content
+            return final_answer.strip()
 
     client = MockClient()
 
@@ -121,12 +119,11 @@ def test_with_config_disabled():
             if not self.extract_final_answer or not self.final_answer_marker:
                 return content
 
-            if self.final_answer_marker in content:
-                marker_pos = content.find(self.final_answer_marker)
-                final_answer = content[marker_pos + len(self.final_answer_marker):].strip()
-                return final_answer
+            _, marker, final_answer = content.partition(self.final_answer_marker)
+            if not marker:
+                return content
 
-            return content
+            return final_answer.strip()
 
     client = MockClient(extract_final_answer=False)
 
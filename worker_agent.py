@@ -1,10 +1,15 @@
 import os
+import re
 import subprocess
+import sys
 import tempfile
-import json
-import time
-from typing import Dict, Any, Optional, Tuple
-from task_queue import TaskQueue, TaskStatus
+import asyncio
+import locale
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from task_queue import TaskStatus, shared_task_queue
 from code_validator import CodeValidator
 from minimal_validator import MinimalValidator
 from context_manager import ContextManager
@@ -12,25 +17,146 @@ from task_classifier import TaskClassifier
 from robust_solution_creator import RobustSolutionCreator
 from multilanguage_solution_creators import MultiLanguageExecutor
 from project_folder_manager import ProjectFolderManager
+from llm_client import LLMClient
+from config import get_llm_config, LLM_MAX_CONCURRENCY
+
+# Signs of a tkinter GUI program, matched case-insensitively in one pass
+_GUI_RE = re.compile(
+    r"tkinter|tk\.|tk\(\)|\.mainloop\(\)|root\.mainloop|window\.mainloop|app\.mainloop",
+    re.IGNORECASE
+)
+
+# Generated scripts run in a fresh interpreter per task so one task's globals,
+# imports or crashes can't leak into the next; this one, not whatever "python"
+# resolves to on PATH, skipping the lookup and using the worker's environment.
+# Scripts are run with -B so these short-lived interpreters don't write bytecode
+# caches for what they import. They run with artifacts/ as the working directory,
+# but sys.path[0] is the script's own location (/proc/self/fd or a temp dir), so
+# artifacts/ is not importable from them.
+_PYTHON = sys.executable or 'python'
+
+# Source scanners. Each pattern table is compiled into one case-insensitive
+# alternation inside a lookahead, so a single pass over the code reports every
+# pattern that occurs anywhere (even where matches would overlap).
+_PYTHON_DANGEROUS_PATTERNS = (
+    ('sys.exit', 'calls sys.exit()'),
+    ('input(', 'uses input() - will hang'),
+    ('while true', 'potential infinite loop'),
+    ('import pandas', 'tries to import pandas'),
+    ('import numpy', 'tries to import numpy'),
+    ('import matplotlib', 'tries to import matplotlib'),
+    ('import seaborn', 'tries to import seaborn'),
+    ('subprocess.', 'uses subprocess'),
+)
+# Relaxed for game development (setInterval is common in games)
+_JAVASCRIPT_DANGEROUS_PATTERNS = (
+    ('eval(', 'uses eval() function'),
+    ('document.write', 'uses document.write'),
+    ('while(true)', 'potential infinite loop'),
+)
+# _fix_common_safety_issues rewrites, applied in one pass; longer forms come first
+# so they win over their prefixes
+_SAFETY_FIXES = {
+    'import pandas as pd': '# import pandas as pd # REMOVED FOR SAFETY',
+    'import pandas': '# import pandas # REMOVED FOR SAFETY',
+    'import numpy as np': '# import numpy as np # REMOVED FOR SAFETY',
+    'import numpy': '# import numpy # REMOVED FOR SAFETY',
+    'import matplotlib.pyplot as plt': '# import matplotlib.pyplot as plt # REMOVED FOR SAFETY',
+    'import matplotlib': '# import matplotlib # REMOVED FOR SAFETY',
+    'import seaborn as sns': '# import seaborn as sns # REMOVED FOR SAFETY',
+    'import seaborn': '# import seaborn # REMOVED FOR SAFETY',
+    # Hardcoded values for input() calls
+    'input("Enter your name: ")': '"Sample User"',
+    'input("Enter a number: ")': '"42"',
+    'input(': '"sample_input"  # input(',
+    'sys.exit(': 'print("Program would exit here")  # sys.exit(',
+}
+_SAFETY_FIX_RE = re.compile('|'.join(map(re.escape, _SAFETY_FIXES)))
+_DATA_UNSAFE_IMPORTS = ('pandas', 'numpy', 'matplotlib', 'seaborn', 'sklearn', 'tensorflow', 'torch')
+# Matched case-sensitively, like the code itself
+_JAVASCRIPT_INDICATORS = (
+    'function ', 'const ', 'let ', 'var ', '=>', 'document.',
+    'window.', 'console.log', 'addEventListener', 'getElementById',
+    'canvas.getContext', 'requestAnimationFrame'
+)
+
+
+def _compile_scanner(patterns, flags=re.IGNORECASE):
+    return re.compile('(?=(' + '|'.join(map(re.escape, patterns)) + '))', flags)
+
+
+def _scan(scanner, code: str) -> set:
+    """The set of (lowercased) scanner patterns that occur in code."""
+    return {match.group(1).lower() for match in scanner.finditer(code)}
+
+
+_PYTHON_DANGER_SCANNER = _compile_scanner(pattern for pattern, _ in _PYTHON_DANGEROUS_PATTERNS)
+_JAVASCRIPT_DANGER_SCANNER = _compile_scanner(pattern for pattern, _ in _JAVASCRIPT_DANGEROUS_PATTERNS)
+_DATA_IMPORT_SCANNER = _compile_scanner(f'import {module}' for module in _DATA_UNSAFE_IMPORTS)
+# "import pandas as pd" is removed whole; other aliases keep their " as ..." tail
+_DATA_IMPORT_RE = re.compile(r'import (?:pandas as pd|(' + '|'.join(_DATA_UNSAFE_IMPORTS) + '))')
+_JAVASCRIPT_RE = re.compile('|'.join(map(re.escape, _JAVASCRIPT_INDICATORS)))
+
+# Only the last ~1 MB of each output stream is kept from executed code, so a
+# chatty or runaway script can't grow the worker's memory without bound.
+# Streams are read as raw bytes, up to a chunk at a time as they arrive, rather
+# than by lines, so output with no newlines is capped too.
+_OUTPUT_TAIL_CHUNK_SIZE = 4096
+_OUTPUT_TAIL_BYTES = 1024 * 1024
+# What text=True would have decoded the pipes with
+_OUTPUT_ENCODING = locale.getpreferredencoding(False)
+_OUTPUT_TRUNCATED_NOTE = '[...truncated, showing last 1 MB...]\n'
 
 class WorkerAgent:
     def __init__(self, model_name: str = None):
         self.model_name = model_name
-        self.task_queue = TaskQueue()
+        self.task_queue = shared_task_queue()
         self.validator = MinimalValidator(model_name)
         self.context_manager = ContextManager()
-        self.task_classifier = TaskClassifier()
-        self.solution_creator = RobustSolutionCreator(model_name)
+        # One LLM connection pool shared by every component this worker calls
+        llm_config = get_llm_config()
+        self.llm_client = LLMClient(
+            provider=llm_config["provider"],
+            model=model_name or llm_config["model"],
+            api_key=llm_config.get("api_key"),
+            base_url=llm_config.get("base_url")
+        )
+        self.task_classifier = TaskClassifier(llm_client=self.llm_client)
+        self.solution_creator = RobustSolutionCreator(model_name, llm_client=self.llm_client)
         self.multilang_executor = MultiLanguageExecutor()
         self.project_manager = ProjectFolderManager()
         self.artifacts_dir = "artifacts"
+        # Execution method per domain; anything else runs as code
+        self._domain_executors = {
+            'code': self._execute_code,
+            'ui': self._execute_code,
+            'game': self._execute_code,
+            'data': self._execute_data_code,
+            'creative': self._execute_creative,
+            'research': self._execute_research,
+        }
+        # project_id -> objective; objectives never change once a project is created
+        self._project_objectives: Dict[str, str] = {}
         
-        # Callback for notifying manager of task completion
+        # Callback for notifying manager of task completion; calls are serialized
+        # so tasks finishing together in process_tasks() don't race in the manager
         self.task_completion_callback = None
+        self._callback_lock = threading.Lock()
         
         # Create artifacts directory if it doesn't exist
         os.makedirs(self.artifacts_dir, exist_ok=True)
     
+    def close(self):
+        """Release the solution creator's executor and the shared LLM connections."""
+        self.solution_creator.close()
+        self.llm_client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
     def set_task_completion_callback(self, callback):
         """Set callback function to notify manager of task completions."""
         self.task_completion_callback = callback
@@ -77,8 +203,9 @@ class WorkerAgent:
             if classification.get('fallback_reason'):
                 print(f"[WORKER] {classification['fallback_reason']}")
         
-        # Update task status to in progress
-        self.task_queue.update_task_status(task_id, TaskStatus.IN_PROGRESS)
+        # Update task status to in progress (claim_next_task already did)
+        if task.get('status') != TaskStatus.IN_PROGRESS.value:
+            self.task_queue.update_task_status(task_id, TaskStatus.IN_PROGRESS)
         
         try:
             # Generate solution using SAFE domain-specific approach
@@ -116,6 +243,8 @@ class WorkerAgent:
             print(f"[WORKER] Executing solution...")
             execution_result = self._execute_solution(final_solution, task, domain)
             print(f"[WORKER] Execution success: {execution_result.get('success')}")
+            # Only solutions that actually ran are kept in the persistent response cache
+            self.solution_creator.report_execution(solution_result['solution'], execution_result['success'])
             
             if not execution_result['success']:
                 print(f"[WORKER] Execution error: {execution_result.get('error')}")
@@ -124,8 +253,7 @@ class WorkerAgent:
             
             if execution_result['success']:
                 # Get project objective for organized saving
-                project_state = self.task_queue.get_project_state(task['subtask_data'].get('project_id'))
-                objective = project_state['objective'] if project_state else task['title']
+                objective = self._get_project_objective(task)
                 
                 # Save artifact using ProjectFolderManager
                 artifact_path = self.project_manager.save_artifact_to_project(
@@ -155,14 +283,15 @@ class WorkerAgent:
                 self.task_queue.update_task_status(
                     task_id, 
                     TaskStatus.COMPLETED, 
-                    result=json.dumps(result)
+                    result=result
                 )
                 
                 # Notify manager of task completion if callback is set
                 if self.task_completion_callback and is_planned_task:
                     project_id = task['subtask_data'].get('project_id')
                     if project_id:
-                        self.task_completion_callback(project_id, task)
+                        with self._callback_lock:
+                            self.task_completion_callback(project_id, task)
                 
                 print(f"[SUCCESS] Task completed: {task['title']}")
                 return True
@@ -198,11 +327,15 @@ class WorkerAgent:
                 if is_planned_task:
                     # For planned tasks, include plan context
                     context = self._generate_plan_aware_context(task, project_id)
-                elif self.context_manager.should_build_upon_existing(task, project_id):
-                    # For regular tasks, use existing context system
-                    context_prompt = self.context_manager.generate_context_prompt(task, project_id)
-                    integration_guidance = self.context_manager.get_code_integration_guidance(task, project_id)
-                    context = f"{context_prompt}\n\nINTEGRATION GUIDANCE: {integration_guidance}"
+                else:
+                    # For regular tasks, use existing context system; the project
+                    # context (a DB query plus an artifact scan) is built once for all three
+                    project_context = self.context_manager.get_project_context(project_id)
+                    if self.context_manager.should_build_upon_existing(task, project_id, project_context):
+                        context_prompt = self.context_manager.generate_context_prompt(task, project_id, project_context)
+                        integration_guidance = self.context_manager.get_code_integration_guidance(
+                            task, project_id, project_context)
+                        context = f"{context_prompt}\n\nINTEGRATION GUIDANCE: {integration_guidance}"
             except Exception as e:
                 print(f"[WORKER] Context generation failed: {e}")
                 context = ""
@@ -210,6 +343,18 @@ class WorkerAgent:
         # Use the SAFE robust solution creator
         return self.solution_creator.create_solution(task, classification, context)
     
+    def _get_project_objective(self, task: Dict[str, Any]) -> str:
+        """Objective of the task's project (looked up once per project), else the task title."""
+        
+        project_id = task['subtask_data'].get('project_id')
+        objective = self._project_objectives.get(project_id)
+        if objective is None:
+            project_state = self.task_queue.get_project_state(project_id)
+            if not project_state:
+                return task['title']
+            objective = self._project_objectives[project_id] = project_state['objective']
+        return objective
+    
     def _generate_plan_aware_context(self, task: Dict[str, Any], project_id: str) -> str:
         """Generate context that's aware of the project plan and dependencies."""
         
@@ -272,18 +417,9 @@ Generate code that fulfills this specific task while being mindful of the larger
         
         print(f"[WORKER] Executing {domain} solution...")
         
-        # Route to appropriate execution method based on domain
-        if domain in ['code', 'ui', 'game']:
-            return self._execute_code(solution, task)
-        elif domain == 'data':
-            return self._execute_data_code(solution, task)
-        elif domain == 'creative':
-            return self._execute_creative(solution, task)
-        elif domain == 'research':
-            return self._execute_research(solution, task)
-        else:
-            # Default to code execution
-            return self._execute_code(solution, task)
+        # Route to appropriate execution method based on domain (default: code execution)
+        execute = self._domain_executors.get(domain, self._execute_code)
+        return execute(solution, task)
     
     def _execute_data_code(self, code: str, task: Dict[str, Any]) -> Dict[str, Any]:
         """Execute data analysis code with extra safety checks."""
@@ -291,18 +427,17 @@ Generate code that fulfills this specific task while being mindful of the larger
         print(f"[WORKER] Executing data analysis code...")
         
         # Check for unsafe data science imports
-        unsafe_imports = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'sklearn', 'tensorflow', 'torch']
-        code_lower = code.lower()
+        found = _scan(_DATA_IMPORT_SCANNER, code)
         
-        for unsafe_import in unsafe_imports:
-            if f'import {unsafe_import}' in code_lower:
+        for unsafe_import in _DATA_UNSAFE_IMPORTS:
+            if f'import {unsafe_import}' in found:
                 print(f"[WORKER] Removing unsafe import: {unsafe_import}")
-                # Replace with safe alternative or remove
-                if unsafe_import == 'pandas':
-                    code = code.replace(f'import {unsafe_import} as pd', '# pandas not available - using pure Python')
-                    code = code.replace(f'import {unsafe_import}', '# pandas not available - using pure Python')
-                else:
-                    code = code.replace(f'import {unsafe_import}', f'# {unsafe_import} not available - using pure Python')
+        
+        # Replace with safe alternative or remove, all modules in one pass
+        if found:
+            code = _DATA_IMPORT_RE.sub(
+                lambda match: f'# {match.group(1) or "pandas"} not available - using pure Python', code
+            )
         
         # Execute the cleaned code
         return self._execute_code(code, task)
@@ -341,7 +476,8 @@ Generate code that fulfills this specific task while being mindful of the larger
                 }
             
             # Check for basic research structure
-            has_structure = any(marker in content.lower() for marker in 
+            content_lower = content.lower()
+            has_structure = any(marker in content_lower for marker in 
                               ['introduction', 'conclusion', 'summary', '##', '#'])
             
             if not has_structure:
@@ -404,96 +540,85 @@ Generate code that fulfills this specific task while being mindful of the larger
         print(f"[WORKER] GUI application detected: {is_gui_app}")
         
         try:
-            # Create a temporary file for the code
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            print(f"[WORKER] Created temp file: {temp_file}")
-            
-            if is_gui_app:
-                # For GUI apps, start the process and check if it starts successfully
-                print(f"[WORKER] Testing GUI application startup...")
+            # The script lives in memory and is removed when the block exits
+            with self._script_file(code) as (script_path, pass_fds):
+                print(f"[WORKER] Created script: {script_path}")
                 
-                process = subprocess.Popen(
-                    ['python', temp_file],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    cwd=self.artifacts_dir
-                )
-                
-                # Give the GUI a few seconds to start up
-                time.sleep(3)
-                
-                # Check if process is still running (good sign for GUI)
-                if process.poll() is None:
-                    # Process is still running - GUI likely started successfully
-                    print(f"[WORKER] GUI application started successfully")
+                if is_gui_app:
+                    # For GUI apps, start the process and check if it starts successfully
+                    print(f"[WORKER] Testing GUI application startup...")
+                    
+                    process = subprocess.Popen(
+                        [_PYTHON, '-B', script_path],
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        cwd=self.artifacts_dir,
+                        pass_fds=pass_fds
+                    )
                     
-                    # Terminate the GUI gracefully
-                    process.terminate()
+                    # Give the GUI a few seconds to start up, returning as soon as
+                    # it exits (a crash) instead of always waiting the full time
                     try:
-                        process.wait(timeout=5)
+                        process.wait(timeout=3)
                     except subprocess.TimeoutExpired:
-                        process.kill()
+                        pass
                     
-                    # Clean up temporary file
-                    os.unlink(temp_file)
-                    
-                    return {
-                        'success': True,
-                        'output': 'GUI application started and ran successfully',
-                        'stderr': ''
-                    }
+                    # Check if process is still running (good sign for GUI)
+                    if process.poll() is None:
+                        # Process is still running - GUI likely started successfully
+                        print(f"[WORKER] GUI application started successfully")
+                        
+                        # Terminate the GUI gracefully
+                        process.terminate()
+                        try:
+                            process.wait(timeout=5)
+                        except subprocess.TimeoutExpired:
+                            process.kill()
+                        
+                        return {
+                            'success': True,
+                            'output': 'GUI application started and ran successfully',
+                            'stderr': ''
+                        }
+                    else:
+                        # Process exited quickly - likely an error
+                        stdout, stderr = process.communicate()
+                        
+                        return {
+                            'success': False,
+                            'error': f'GUI application failed to start: {stderr}',
+                            'stdout': stdout
+                        }
                 else:
-                    # Process exited quickly - likely an error
-                    stdout, stderr = process.communicate()
-                    os.unlink(temp_file)
+                    # For non-GUI apps, run normally with SHORT timeout
+                    print(f"[WORKER] Running non-GUI application...")
+                    result = self._run_with_output_tail(
+                        [_PYTHON, '-B', script_path],
+                        timeout=15,  # REDUCED timeout to 15 seconds
+                        pass_fds=pass_fds
+                    )
+                    
+                    print(f"[WORKER] Process return code: {result.returncode}")
+                    print(f"[WORKER] Process stdout: {result.stdout[:200]}...")
+                    print(f"[WORKER] Process stderr: {result.stderr}")
+                    
+                    if result.returncode == 0:
+                        return {
+                            'success': True,
+                            'output': result.stdout,
+                            'stderr': result.stderr
+                        }
+                    else:
+                        return {
+                            'success': False,
+                            'error': f'Code execution failed (return code {result.returncode}): {result.stderr}',
+                            'stdout': result.stdout
+                        }
                     
-                    return {
-                        'success': False,
-                        'error': f'GUI application failed to start: {stderr}',
-                        'stdout': stdout
-                    }
-            else:
-                # For non-GUI apps, run normally with SHORT timeout
-                print(f"[WORKER] Running non-GUI application...")
-                result = subprocess.run(
-                    ['python', temp_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=15,  # REDUCED timeout to 15 seconds
-                    cwd=self.artifacts_dir
-                )
-                
-                # Clean up temporary file
-                os.unlink(temp_file)
-                
-                print(f"[WORKER] Process return code: {result.returncode}")
-                print(f"[WORKER] Process stdout: {result.stdout[:200]}...")
-                print(f"[WORKER] Process stderr: {result.stderr}")
-                
-                if result.returncode == 0:
-                    return {
-                        'success': True,
-                        'output': result.stdout,
-                        'stderr': result.stderr
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': f'Code execution failed (return code {result.returncode}): {result.stderr}',
-                        'stdout': result.stdout
-                    }
-                
         except subprocess.TimeoutExpired:
             print(f"[WORKER] Code execution timed out")
-            # Clean up temp file
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
             return {
                 'success': False,
                 'error': 'Code execution timed out (15 seconds) - likely contains input() or infinite loop'
@@ -505,17 +630,94 @@ Generate code that fulfills this specific task while being mindful of the larger
                 'error': f'Error executing code: {str(e)}'
             }
     
+    @contextmanager
+    def _script_file(self, code: str):
+        """Yield (path, pass_fds) for a runnable copy of code, removed on exit.
+        
+        On Linux the script is an anonymous in-memory file the child opens via
+        /proc/self/fd (the descriptor must be passed to it); elsewhere it is a
+        temporary file, in /dev/shm when available.
+        """
+        
+        if hasattr(os, 'memfd_create') and os.path.isdir('/proc/self/fd'):
+            fd = os.memfd_create('worker_script')
+            try:
+                os.write(fd, code.encode())
+                yield f'/proc/self/fd/{fd}', (fd,)
+            finally:
+                os.close(fd)
+            return
+        
+        script_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', dir=script_dir, delete=False) as f:
+            f.write(code)
+        try:
+            yield f.name, ()
+        finally:
+            os.unlink(f.name)
+    
+    def _run_with_output_tail(self, args, timeout: float, pass_fds=()) -> subprocess.CompletedProcess:
+        """Like subprocess.run(capture_output=True, text=True), keeping only the output tail.
+        
+        Each stream is read in chunks as it is produced into a bounded buffer
+        instead of being accumulated whole, and decoded once at the end; output
+        that overflowed it starts with a truncation note. Raises TimeoutExpired
+        after killing the process, like subprocess.run.
+        """
+        
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.artifacts_dir,
+            pass_fds=pass_fds
+        )
+        tails = (deque(), deque())
+        truncated = [False, False]
+        
+        def read_tail(index, stream):
+            # os.read returns whatever the pipe holds (up to a chunk) instead of
+            # blocking until a full chunk or EOF, as a text-mode read() would
+            tail, size, fd = tails[index], 0, stream.fileno()
+            for chunk in iter(lambda: os.read(fd, _OUTPUT_TAIL_CHUNK_SIZE), b''):
+                tail.append(chunk)
+                size += len(chunk)
+                while size - len(tail[0]) >= _OUTPUT_TAIL_BYTES:
+                    size -= len(tail.popleft())
+                    truncated[index] = True
+        
+        readers = [
+            threading.Thread(target=read_tail, args=(index, stream), daemon=True)
+            for index, stream in enumerate((process.stdout, process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            # Grandchildren can hold the pipes open; don't wait on them forever
+            for reader in readers:
+                reader.join(timeout=1)
+            process.stdout.close()
+            process.stderr.close()
+        
+        stdout, stderr = (
+            (_OUTPUT_TRUNCATED_NOTE if cut else '') + b''.join(tail).decode(_OUTPUT_ENCODING, errors='replace')
+            for tail, cut in zip(tails, truncated)
+        )
+        return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+    
     def _detect_code_language(self, code: str) -> str:
         """Detect programming language from code content."""
         
         # JavaScript indicators
-        js_indicators = [
-            'function ', 'const ', 'let ', 'var ', '=>', 'document.',
-            'window.', 'console.log', 'addEventListener', 'getElementById',
-            'canvas.getContext', 'requestAnimationFrame'
-        ]
-        
-        if any(indicator in code for indicator in js_indicators):
+        if _JAVASCRIPT_RE.search(code):
             return 'javascript'
         
         return 'python'  # Default to Python
@@ -523,95 +725,27 @@ Generate code that fulfills this specific task while being mindful of the larger
     def _check_javascript_safety(self, code: str) -> list:
         """Check JavaScript code for basic safety issues."""
         
-        issues = []
-        code_lower = code.lower()
-        
         # Check for potentially dangerous patterns (relaxed for game development)
-        dangerous_patterns = [
-            ('eval(', 'uses eval() function'),
-            ('document.write', 'uses document.write'),
-            ('while(true)', 'potential infinite loop'),
-            # Removed setInterval check - it's common in games
-        ]
-        
-        for pattern, description in dangerous_patterns:
-            if pattern in code_lower:
-                issues.append(description)
-        
-        return issues
+        found = _scan(_JAVASCRIPT_DANGER_SCANNER, code)
+        return [description for pattern, description in _JAVASCRIPT_DANGEROUS_PATTERNS if pattern in found]
     
     def _check_code_safety(self, code: str) -> list:
         """Check code for safety issues."""
         
-        issues = []
-        code_lower = code.lower()
-        
         # Check for dangerous patterns
-        dangerous_patterns = [
-            ('sys.exit', 'calls sys.exit()'),
-            ('input(', 'uses input() - will hang'),
-            ('while true', 'potential infinite loop'),
-            ('import pandas', 'tries to import pandas'),
-            ('import numpy', 'tries to import numpy'),
-            ('import matplotlib', 'tries to import matplotlib'),
-            ('import seaborn', 'tries to import seaborn'),
-            ('subprocess.', 'uses subprocess'),
-        ]
-        
-        for pattern, description in dangerous_patterns:
-            if pattern in code_lower:
-                issues.append(description)
-        
-        return issues
+        found = _scan(_PYTHON_DANGER_SCANNER, code)
+        return [description for pattern, description in _PYTHON_DANGEROUS_PATTERNS if pattern in found]
     
     def _fix_common_safety_issues(self, code: str) -> str:
         """Fix common safety issues in code."""
         
-        # Remove dangerous imports
-        dangerous_imports = [
-            'import pandas as pd',
-            'import pandas',
-            'import numpy as np', 
-            'import numpy',
-            'import matplotlib.pyplot as plt',
-            'import matplotlib',
-            'import seaborn as sns',
-            'import seaborn'
-        ]
-        
-        for dangerous_import in dangerous_imports:
-            if dangerous_import in code:
-                code = code.replace(dangerous_import, f'# {dangerous_import} # REMOVED FOR SAFETY')
-        
-        # Replace input() calls with hardcoded values
-        if 'input(' in code:
-            code = code.replace('input("Enter your name: ")', '"Sample User"')
-            code = code.replace('input("Enter a number: ")', '"42"')
-            code = code.replace('input(', '"sample_input"  # input(')
-        
-        # Replace sys.exit() calls
-        if 'sys.exit(' in code:
-            code = code.replace('sys.exit(', 'print("Program would exit here")  # sys.exit(')
-        
-        return code
+        # Remove dangerous imports, replace input() and sys.exit() calls
+        return _SAFETY_FIX_RE.sub(lambda match: _SAFETY_FIXES[match.group()], code)
     
     def _is_gui_application(self, code: str) -> bool:
         """Detect if the code is a GUI application."""
         
-        gui_indicators = [
-            'tkinter',
-            'tk.',
-            '.mainloop()',
-            'root.mainloop',
-            'window.mainloop',
-            'app.mainloop',
-            'Tk()',
-            'tkinter.Tk',
-            'from tkinter import'
-        ]
-        
-        code_lower = code.lower()
-        return any(indicator.lower() in code_lower for indicator in gui_indicators)
+        return _GUI_RE.search(code) is not None
     
     def show_project_structure(self):
         """Display the organized project structure."""
@@ -658,11 +792,18 @@ Generate code that fulfills this specific task while being mindful of the larger
     def process_next_task(self) -> Optional[Dict[str, Any]]:
         """Get and process the next available task."""
         
-        task = self.task_queue.get_next_task()
+        # Claim (not just peek) so concurrent workers never run the same task
+        task = self.task_queue.claim_next_task()
         if not task:
             return None
         
-        success = self.execute_task(task)
+        try:
+            success = self.execute_task(task)
+        except Exception as e:
+            # Don't leave a claimed task stuck in progress
+            print(f"[ERROR] Task failed with exception: {str(e)}")
+            self.task_queue.update_task_status(task['id'], TaskStatus.FAILED, error_message=str(e))
+            success = False
         
         return {
             'task_id': task['id'],
@@ -671,6 +812,36 @@ Generate code that fulfills this specific task while being mindful of the larger
             'subtask_data': task.get('subtask_data', {})
         }
     
+    async def process_tasks(self, max_concurrent: int = LLM_MAX_CONCURRENCY, max_tasks: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process pending tasks concurrently until the queue is empty.
+        
+        Up to max_concurrent tasks run at once, each in a worker thread, so their
+        LLM round-trips and script runs overlap. Tasks added while others run
+        (e.g. by the completion callback) are picked up too. Returns the
+        process_next_task() results in completion order. If a drainer fails
+        (e.g. the queue can't be read), the others still run to completion
+        before its exception is raised.
+        """
+        
+        results = []
+        started = 0
+        
+        async def drain():
+            nonlocal started
+            while max_tasks is None or started < max_tasks:
+                started += 1
+                result = await asyncio.to_thread(self.process_next_task)
+                if result is None:
+                    return
+                results.append(result)
+        
+        outcomes = await asyncio.gather(*(drain() for _ in range(max_concurrent)),
+                                        return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return results
+    
     def get_task_execution_stats(self) -> Dict[str, Any]:
         """Get statistics about task execution."""
         
@@ -689,7 +860,7 @@ Generate code that fulfills this specific task while being mindful of the larger
         for task in completed_tasks:
             if task['result']:
                 try:
-                    result_data = json.loads(task['result'])
+                    result_data = self.task_queue.load_result(task['result'])
                     domain = result_data.get('domain', 'unknown')
                     domain_counts[domain] = domain_counts.get(domain, 0) + 1
                 except:
@@ -707,27 +878,36 @@ Generate code that fulfills this specific task while being mindful of the larger
         """Display a summary of task execution performance."""
         
         stats = self.get_task_execution_stats()
+        task_counts = stats['task_counts']
+        domain_distribution = stats['domain_distribution']
+        
+        # Built up and printed in one write
+        lines = [
+            "\n⚙️ WORKER EXECUTION SUMMARY",
+            "="*50,
+            f"📊 Success Rate: {stats['success_rate']}%",
+            f"✅ Completed: {task_counts.get('completed', 0)}",
+            f"❌ Failed: {task_counts.get('failed', 0)}",
+            f"⏳ Pending: {task_counts.get('pending', 0)}",
+            f"📁 Artifacts: {stats['artifacts_created']}",
+        ]
+        
+        if domain_distribution:
+            lines.append(f"\n🏷️ Domain Distribution:")
+            # Most common domains first
+            lines.extend(
+                f"   {domain}: {count} tasks"
+                for domain, count in sorted(domain_distribution.items(), key=lambda item: -item[1])
+            )
         
-        print("\n⚙️ WORKER EXECUTION SUMMARY")
-        print("="*50)
-        print(f"📊 Success Rate: {stats['success_rate']}%")
-        print(f"✅ Completed: {stats['task_counts'].get('completed', 0)}")
-        print(f"❌ Failed: {stats['task_counts'].get('failed', 0)}")
-        print(f"⏳ Pending: {stats['task_counts'].get('pending', 0)}")
-        print(f"📁 Artifacts: {stats['artifacts_created']}")
-        
-        if stats['domain_distribution']:
-            print(f"\n🏷️ Domain Distribution:")
-            for domain, count in stats['domain_distribution'].items():
-                print(f"   {domain}: {count} tasks")
+        print('\n'.join(lines))
     
     # Legacy method for backward compatibility
     def _save_specialized_artifact(self, task: Dict[str, Any], solution: str, domain: str) -> str:
         """Legacy method - now redirects to ProjectFolderManager."""
         
         # Get project objective for organized saving
-        project_state = self.task_queue.get_project_state(task['subtask_data'].get('project_id'))
-        objective = project_state['objective'] if project_state else task['title']
+        objective = self._get_project_objective(task)
         
         # Use ProjectFolderManager for organized saving
         return self.project_manager.save_artifact_to_project(